@@ -0,0 +1,231 @@
+# cython: boundscheck=False, wraparound=False, cdivision=True, language_level=3
+"""
+AES-256 dùng T-tables, biên dịch AoT bằng Cython
+- Backend tùy chọn cho aes256.py khi không có _aes_hw.so và thư viện cryptography
+- S-box và T-tables được tính lúc import (nghịch đảo GF(2^8) + biến đổi affine)
+
+Build:
+    cythonize -i _aes_cy.pyx
+"""
+
+from libc.stdint cimport uint8_t, uint32_t
+
+cdef uint8_t SBOX[256]
+cdef uint8_t INV_SBOX[256]
+cdef uint32_t TE0[256]
+cdef uint32_t TE1[256]
+cdef uint32_t TE2[256]
+cdef uint32_t TE3[256]
+cdef uint32_t TD0[256]
+cdef uint32_t TD1[256]
+cdef uint32_t TD2[256]
+cdef uint32_t TD3[256]
+cdef uint32_t RCON[7]
+
+
+cdef inline uint8_t rotl8(uint8_t x, int n):
+    return <uint8_t>((x << n) | (x >> (8 - n)))
+
+
+cdef inline uint32_t ror8(uint32_t w):
+    return (w >> 8) | (w << 24)
+
+
+cdef uint8_t gmul(uint8_t a, uint8_t b):
+    """Phép nhân trong trường Galois GF(2^8)"""
+    cdef uint8_t p = 0
+    cdef int i
+    for i in range(8):
+        if b & 1:
+            p ^= a
+        a = <uint8_t>((a << 1) ^ (0x1b if a & 0x80 else 0))
+        b >>= 1
+    return p
+
+
+cdef void init_tables():
+    cdef uint8_t p = 1, q = 1, x, s
+    cdef int i
+
+    # S-box: p chạy qua mọi phần tử khác 0 (nhân 3), q = p^-1 (chia 3)
+    while True:
+        p = <uint8_t>(p ^ (p << 1) ^ (0x1b if p & 0x80 else 0))
+        q ^= <uint8_t>(q << 1)
+        q ^= <uint8_t>(q << 2)
+        q ^= <uint8_t>(q << 4)
+        if q & 0x80:
+            q ^= 0x09
+        x = q ^ rotl8(q, 1) ^ rotl8(q, 2) ^ rotl8(q, 3) ^ rotl8(q, 4)
+        SBOX[p] = x ^ 0x63
+        if p == 1:
+            break
+    SBOX[0] = 0x63
+
+    for i in range(256):
+        INV_SBOX[SBOX[i]] = <uint8_t>i
+
+    for i in range(256):
+        s = SBOX[i]
+        TE0[i] = (<uint32_t>gmul(s, 2) << 24) | (<uint32_t>s << 16) | (<uint32_t>s << 8) | gmul(s, 3)
+        TE1[i] = ror8(TE0[i])
+        TE2[i] = ror8(TE1[i])
+        TE3[i] = ror8(TE2[i])
+        s = INV_SBOX[i]
+        TD0[i] = ((<uint32_t>gmul(s, 14) << 24) | (<uint32_t>gmul(s, 9) << 16) |
+                  (<uint32_t>gmul(s, 13) << 8) | gmul(s, 11))
+        TD1[i] = ror8(TD0[i])
+        TD2[i] = ror8(TD1[i])
+        TD3[i] = ror8(TD2[i])
+
+    x = 1
+    for i in range(7):
+        RCON[i] = x
+        x = <uint8_t>((x << 1) ^ (0x1b if x & 0x80 else 0))
+
+
+init_tables()
+
+
+cdef inline uint32_t load_word(const uint8_t *b):
+    return (<uint32_t>b[0] << 24) | (<uint32_t>b[1] << 16) | (<uint32_t>b[2] << 8) | b[3]
+
+
+cdef inline void store_word(uint8_t *b, uint32_t w):
+    b[0] = <uint8_t>(w >> 24)
+    b[1] = <uint8_t>(w >> 16)
+    b[2] = <uint8_t>(w >> 8)
+    b[3] = <uint8_t>w
+
+
+cdef inline uint32_t sub_word(uint32_t w):
+    return ((<uint32_t>SBOX[w >> 24] << 24) | (<uint32_t>SBOX[(w >> 16) & 0xFF] << 16) |
+            (<uint32_t>SBOX[(w >> 8) & 0xFF] << 8) | SBOX[w & 0xFF])
+
+
+cdef void key_expansion(const uint8_t *key, uint32_t w[60]):
+    """Mở rộng khóa 256-bit thành 60 words"""
+    cdef uint32_t t
+    cdef int i
+    for i in range(8):
+        w[i] = load_word(key + 4 * i)
+    for i in range(8, 60):
+        t = w[i - 1]
+        if i % 8 == 0:
+            t = sub_word((t << 8) | (t >> 24)) ^ (RCON[i // 8 - 1] << 24)
+        elif i % 8 == 4:
+            t = sub_word(t)
+        w[i] = w[i - 8] ^ t
+
+
+cdef void inv_key_expansion(const uint32_t w[60], uint32_t dw[60]):
+    """Round keys giải mã: InvMixColumns cho round key 1-13"""
+    cdef uint32_t t
+    cdef int i
+    for i in range(60):
+        dw[i] = w[i]
+    for i in range(4, 56):
+        t = w[i]
+        dw[i] = (TD0[SBOX[t >> 24]] ^ TD1[SBOX[(t >> 16) & 0xFF]] ^
+                 TD2[SBOX[(t >> 8) & 0xFF]] ^ TD3[SBOX[t & 0xFF]])
+
+
+cdef void encrypt_one(const uint8_t *inp, uint8_t *out, const uint32_t w[60]):
+    cdef uint32_t s0, s1, s2, s3, t0, t1, t2, t3
+    cdef int k
+
+    s0 = load_word(inp) ^ w[0]
+    s1 = load_word(inp + 4) ^ w[1]
+    s2 = load_word(inp + 8) ^ w[2]
+    s3 = load_word(inp + 12) ^ w[3]
+
+    for k in range(4, 56, 4):
+        t0 = TE0[s0 >> 24] ^ TE1[(s1 >> 16) & 0xFF] ^ TE2[(s2 >> 8) & 0xFF] ^ TE3[s3 & 0xFF] ^ w[k]
+        t1 = TE0[s1 >> 24] ^ TE1[(s2 >> 16) & 0xFF] ^ TE2[(s3 >> 8) & 0xFF] ^ TE3[s0 & 0xFF] ^ w[k + 1]
+        t2 = TE0[s2 >> 24] ^ TE1[(s3 >> 16) & 0xFF] ^ TE2[(s0 >> 8) & 0xFF] ^ TE3[s1 & 0xFF] ^ w[k + 2]
+        t3 = TE0[s3 >> 24] ^ TE1[(s0 >> 16) & 0xFF] ^ TE2[(s1 >> 8) & 0xFF] ^ TE3[s2 & 0xFF] ^ w[k + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+
+    store_word(out, ((<uint32_t>SBOX[s0 >> 24] << 24) | (<uint32_t>SBOX[(s1 >> 16) & 0xFF] << 16) |
+                     (<uint32_t>SBOX[(s2 >> 8) & 0xFF] << 8) | SBOX[s3 & 0xFF]) ^ w[56])
+    store_word(out + 4, ((<uint32_t>SBOX[s1 >> 24] << 24) | (<uint32_t>SBOX[(s2 >> 16) & 0xFF] << 16) |
+                         (<uint32_t>SBOX[(s3 >> 8) & 0xFF] << 8) | SBOX[s0 & 0xFF]) ^ w[57])
+    store_word(out + 8, ((<uint32_t>SBOX[s2 >> 24] << 24) | (<uint32_t>SBOX[(s3 >> 16) & 0xFF] << 16) |
+                         (<uint32_t>SBOX[(s0 >> 8) & 0xFF] << 8) | SBOX[s1 & 0xFF]) ^ w[58])
+    store_word(out + 12, ((<uint32_t>SBOX[s3 >> 24] << 24) | (<uint32_t>SBOX[(s0 >> 16) & 0xFF] << 16) |
+                          (<uint32_t>SBOX[(s1 >> 8) & 0xFF] << 8) | SBOX[s2 & 0xFF]) ^ w[59])
+
+
+cdef void decrypt_one(const uint8_t *inp, uint8_t *out, const uint32_t dw[60]):
+    cdef uint32_t s0, s1, s2, s3, t0, t1, t2, t3
+    cdef int k
+
+    s0 = load_word(inp) ^ dw[56]
+    s1 = load_word(inp + 4) ^ dw[57]
+    s2 = load_word(inp + 8) ^ dw[58]
+    s3 = load_word(inp + 12) ^ dw[59]
+
+    for k in range(52, 0, -4):
+        t0 = TD0[s0 >> 24] ^ TD1[(s3 >> 16) & 0xFF] ^ TD2[(s2 >> 8) & 0xFF] ^ TD3[s1 & 0xFF] ^ dw[k]
+        t1 = TD0[s1 >> 24] ^ TD1[(s0 >> 16) & 0xFF] ^ TD2[(s3 >> 8) & 0xFF] ^ TD3[s2 & 0xFF] ^ dw[k + 1]
+        t2 = TD0[s2 >> 24] ^ TD1[(s1 >> 16) & 0xFF] ^ TD2[(s0 >> 8) & 0xFF] ^ TD3[s3 & 0xFF] ^ dw[k + 2]
+        t3 = TD0[s3 >> 24] ^ TD1[(s2 >> 16) & 0xFF] ^ TD2[(s1 >> 8) & 0xFF] ^ TD3[s0 & 0xFF] ^ dw[k + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+
+    store_word(out, ((<uint32_t>INV_SBOX[s0 >> 24] << 24) | (<uint32_t>INV_SBOX[(s3 >> 16) & 0xFF] << 16) |
+                     (<uint32_t>INV_SBOX[(s2 >> 8) & 0xFF] << 8) | INV_SBOX[s1 & 0xFF]) ^ dw[0])
+    store_word(out + 4, ((<uint32_t>INV_SBOX[s1 >> 24] << 24) | (<uint32_t>INV_SBOX[(s0 >> 16) & 0xFF] << 16) |
+                         (<uint32_t>INV_SBOX[(s3 >> 8) & 0xFF] << 8) | INV_SBOX[s2 & 0xFF]) ^ dw[1])
+    store_word(out + 8, ((<uint32_t>INV_SBOX[s2 >> 24] << 24) | (<uint32_t>INV_SBOX[(s1 >> 16) & 0xFF] << 16) |
+                         (<uint32_t>INV_SBOX[(s0 >> 8) & 0xFF] << 8) | INV_SBOX[s3 & 0xFF]) ^ dw[2])
+    store_word(out + 12, ((<uint32_t>INV_SBOX[s3 >> 24] << 24) | (<uint32_t>INV_SBOX[(s2 >> 16) & 0xFF] << 16) |
+                          (<uint32_t>INV_SBOX[(s1 >> 8) & 0xFF] << 8) | INV_SBOX[s0 & 0xFF]) ^ dw[3])
+
+
+def encrypt_blocks(const uint8_t[::1] data, const uint8_t[::1] key,
+                   uint8_t[::1] out=None, Py_ssize_t offset=0):
+    """
+    Mã hóa data (bội số của 16 bytes) ở chế độ ECB với key 32 bytes
+    - Không có out: trả về bytes
+    - Có out (buffer ghi được): ghi thẳng vào out[offset:], trả về None
+    """
+    cdef uint32_t w[60]
+    cdef Py_ssize_t n = data.shape[0], off
+
+    if key.shape[0] != 32 or n % 16 != 0:
+        raise ValueError("Cần key 32 bytes và dữ liệu là bội số của 16 bytes")
+
+    result = None
+    if out is None:
+        result = bytearray(n)
+        out = result
+        offset = 0
+    elif offset < 0 or out.shape[0] - offset < n:
+        raise ValueError("Buffer out không đủ chỗ cho kết quả")
+
+    if n > 0:
+        key_expansion(&key[0], w)
+        for off in range(0, n, 16):
+            encrypt_one(&data[off], &out[offset + off], w)
+    return None if result is None else bytes(result)
+
+
+def decrypt_blocks(const uint8_t[::1] data, const uint8_t[::1] key):
+    """
+    Giải mã data (bội số của 16 bytes) ở chế độ ECB với key 32 bytes
+    """
+    cdef uint32_t w[60]
+    cdef uint32_t dw[60]
+    cdef Py_ssize_t n = data.shape[0], off
+    out = bytearray(n)
+    cdef uint8_t[::1] o = out
+
+    if key.shape[0] != 32 or n % 16 != 0:
+        raise ValueError("Cần key 32 bytes và dữ liệu là bội số của 16 bytes")
+    if n == 0:
+        return b''
+
+    key_expansion(&key[0], w)
+    inv_key_expansion(w, dw)
+    for off in range(0, n, 16):
+        decrypt_one(&data[off], &o[off], dw)
+    return bytes(out)
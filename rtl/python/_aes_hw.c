@@ -0,0 +1,396 @@
+/*
+ * AES-256 backend dùng lệnh AES phần cứng của CPU
+ * - Được aes256.py nạp qua ctypes, nếu không có thì dùng code Python thuần
+ * - x86-64: AES-NI, key expansion theo Intel AES-NI White Paper (AES-256)
+ *           Nhiều block (ECB): dùng VAES 512-bit, 8 block/vòng lặp nếu CPU hỗ trợ
+ * - ARMv8 (Raspberry Pi 5, Apple Silicon): Cryptography Extensions
+ *   (Raspberry Pi 3/4 không có Crypto Extensions: hw_supported() trả về 0,
+ *   aes256.py dùng backend khác)
+ * - Cả hai kiến trúc export cùng các hàm: hw_supported, encrypt_block,
+ *   decrypt_block, encrypt_blocks, decrypt_blocks
+ *
+ * Build:
+ *   x86-64:  gcc -O2 -shared -fPIC -o _aes_hw.so _aes_hw.c
+ *   ARMv8:   gcc -O2 -march=armv8-a+crypto -shared -fPIC -o _aes_hw.so _aes_hw.c
+ *   (macOS:  clang -O2 -shared -fPIC -o _aes_hw.so _aes_hw.c)
+ */
+
+#include <stddef.h>
+#include <stdint.h>
+
+#if defined(__x86_64__) || defined(__i386__)
+
+#include <immintrin.h>
+
+#define AESNI_TARGET __attribute__((target("aes,sse2")))
+#define VAES_TARGET  __attribute__((target("vaes,avx512f")))
+
+/* Trả về 1 nếu CPU hỗ trợ AES-NI */
+int hw_supported(void)
+{
+    __builtin_cpu_init();
+    return __builtin_cpu_supports("aes");
+}
+
+/* Trả về 1 nếu CPU hỗ trợ VAES trên thanh ghi 512-bit */
+int vaes_supported(void)
+{
+    __builtin_cpu_init();
+    return __builtin_cpu_supports("vaes") && __builtin_cpu_supports("avx512f");
+}
+
+static inline AESNI_TARGET __m128i key_256_assist_1(__m128i t1, __m128i t2)
+{
+    __m128i t4;
+    t2 = _mm_shuffle_epi32(t2, 0xff);
+    t4 = _mm_slli_si128(t1, 0x4);
+    t1 = _mm_xor_si128(t1, t4);
+    t4 = _mm_slli_si128(t4, 0x4);
+    t1 = _mm_xor_si128(t1, t4);
+    t4 = _mm_slli_si128(t4, 0x4);
+    t1 = _mm_xor_si128(t1, t4);
+    return _mm_xor_si128(t1, t2);
+}
+
+static inline AESNI_TARGET __m128i key_256_assist_2(__m128i t1, __m128i t3)
+{
+    __m128i t2, t4;
+    t4 = _mm_aeskeygenassist_si128(t1, 0x0);
+    t2 = _mm_shuffle_epi32(t4, 0xaa);
+    t4 = _mm_slli_si128(t3, 0x4);
+    t3 = _mm_xor_si128(t3, t4);
+    t4 = _mm_slli_si128(t4, 0x4);
+    t3 = _mm_xor_si128(t3, t4);
+    t4 = _mm_slli_si128(t4, 0x4);
+    t3 = _mm_xor_si128(t3, t4);
+    return _mm_xor_si128(t3, t2);
+}
+
+/* _mm_aeskeygenassist_si128 cần Rcon là hằng số → dùng macro */
+#define KEY_256_STEP(i, rcon)                                   \
+    do {                                                        \
+        t2 = _mm_aeskeygenassist_si128(t3, rcon);               \
+        t1 = key_256_assist_1(t1, t2);                          \
+        rk[i] = t1;                                             \
+        if ((i) < 14) {                                         \
+            t3 = key_256_assist_2(t1, t3);                      \
+            rk[(i) + 1] = t3;                                   \
+        }                                                       \
+    } while (0)
+
+/* Mở rộng khóa 256-bit thành 15 round keys */
+static AESNI_TARGET void key_expansion(const uint8_t *key, __m128i rk[15])
+{
+    __m128i t1, t2, t3;
+
+    t1 = _mm_loadu_si128((const __m128i *)key);
+    t3 = _mm_loadu_si128((const __m128i *)(key + 16));
+    rk[0] = t1;
+    rk[1] = t3;
+
+    KEY_256_STEP(2, 0x01);
+    KEY_256_STEP(4, 0x02);
+    KEY_256_STEP(6, 0x04);
+    KEY_256_STEP(8, 0x08);
+    KEY_256_STEP(10, 0x10);
+    KEY_256_STEP(12, 0x20);
+    KEY_256_STEP(14, 0x40);
+}
+
+/* Round keys cho giải mã: áp dụng InvMixColumns cho rk[1..13] */
+static AESNI_TARGET void inv_key_expansion(const __m128i rk[15], __m128i dk[15])
+{
+    int r;
+
+    dk[0] = rk[0];
+    for (r = 1; r < 14; r++)
+        dk[r] = _mm_aesimc_si128(rk[r]);
+    dk[14] = rk[14];
+}
+
+static inline AESNI_TARGET __m128i encrypt_one(__m128i x, const __m128i rk[15])
+{
+    int r;
+
+    x = _mm_xor_si128(x, rk[0]);
+    for (r = 1; r < 14; r++)
+        x = _mm_aesenc_si128(x, rk[r]);
+    return _mm_aesenclast_si128(x, rk[14]);
+}
+
+static inline AESNI_TARGET __m128i decrypt_one(__m128i x, const __m128i dk[15])
+{
+    int r;
+
+    x = _mm_xor_si128(x, dk[14]);
+    for (r = 13; r > 0; r--)
+        x = _mm_aesdec_si128(x, dk[r]);
+    return _mm_aesdeclast_si128(x, dk[0]);
+}
+
+/* Mã hóa 8 block/lần (2 thanh ghi 512-bit x 4 block), trả về số block đã xử lý */
+static VAES_TARGET size_t encrypt_x8_vaes(const uint8_t *in, uint8_t *out, size_t n,
+                                          const __m128i rk[15])
+{
+    __m512i k[15];
+    __m512i a, b;
+    size_t i;
+    int r;
+
+    for (r = 0; r < 15; r++)
+        k[r] = _mm512_broadcast_i32x4(rk[r]);
+
+    for (i = 0; i + 8 <= n; i += 8) {
+        a = _mm512_loadu_si512((const void *)(in + 16 * i));
+        b = _mm512_loadu_si512((const void *)(in + 16 * i + 64));
+        a = _mm512_xor_si512(a, k[0]);
+        b = _mm512_xor_si512(b, k[0]);
+        for (r = 1; r < 14; r++) {
+            a = _mm512_aesenc_epi128(a, k[r]);
+            b = _mm512_aesenc_epi128(b, k[r]);
+        }
+        a = _mm512_aesenclast_epi128(a, k[14]);
+        b = _mm512_aesenclast_epi128(b, k[14]);
+        _mm512_storeu_si512((void *)(out + 16 * i), a);
+        _mm512_storeu_si512((void *)(out + 16 * i + 64), b);
+    }
+    return i;
+}
+
+/* Giải mã 8 block/lần, trả về số block đã xử lý */
+static VAES_TARGET size_t decrypt_x8_vaes(const uint8_t *in, uint8_t *out, size_t n,
+                                          const __m128i dk[15])
+{
+    __m512i k[15];
+    __m512i a, b;
+    size_t i;
+    int r;
+
+    for (r = 0; r < 15; r++)
+        k[r] = _mm512_broadcast_i32x4(dk[r]);
+
+    for (i = 0; i + 8 <= n; i += 8) {
+        a = _mm512_loadu_si512((const void *)(in + 16 * i));
+        b = _mm512_loadu_si512((const void *)(in + 16 * i + 64));
+        a = _mm512_xor_si512(a, k[14]);
+        b = _mm512_xor_si512(b, k[14]);
+        for (r = 13; r > 0; r--) {
+            a = _mm512_aesdec_epi128(a, k[r]);
+            b = _mm512_aesdec_epi128(b, k[r]);
+        }
+        a = _mm512_aesdeclast_epi128(a, k[0]);
+        b = _mm512_aesdeclast_epi128(b, k[0]);
+        _mm512_storeu_si512((void *)(out + 16 * i), a);
+        _mm512_storeu_si512((void *)(out + 16 * i + 64), b);
+    }
+    return i;
+}
+
+/* Mã hóa 1 block 16 bytes */
+AESNI_TARGET void encrypt_block(const uint8_t *pt, const uint8_t *key, uint8_t *out)
+{
+    __m128i rk[15];
+
+    key_expansion(key, rk);
+    _mm_storeu_si128((__m128i *)out,
+                     encrypt_one(_mm_loadu_si128((const __m128i *)pt), rk));
+}
+
+/* Giải mã 1 block 16 bytes (Equivalent Inverse Cipher) */
+AESNI_TARGET void decrypt_block(const uint8_t *ct, const uint8_t *key, uint8_t *out)
+{
+    __m128i rk[15], dk[15];
+
+    key_expansion(key, rk);
+    inv_key_expansion(rk, dk);
+    _mm_storeu_si128((__m128i *)out,
+                     decrypt_one(_mm_loadu_si128((const __m128i *)ct), dk));
+}
+
+/* Mã hóa n block liên tiếp (ECB), key expansion chỉ chạy 1 lần */
+AESNI_TARGET void encrypt_blocks(const uint8_t *in, size_t n, const uint8_t *key, uint8_t *out)
+{
+    __m128i rk[15];
+    size_t i = 0;
+
+    key_expansion(key, rk);
+    if (vaes_supported())
+        i = encrypt_x8_vaes(in, out, n, rk);
+    for (; i < n; i++)
+        _mm_storeu_si128((__m128i *)(out + 16 * i),
+                         encrypt_one(_mm_loadu_si128((const __m128i *)(in + 16 * i)), rk));
+}
+
+/* Giải mã n block liên tiếp (ECB), key expansion chỉ chạy 1 lần */
+AESNI_TARGET void decrypt_blocks(const uint8_t *in, size_t n, const uint8_t *key, uint8_t *out)
+{
+    __m128i rk[15], dk[15];
+    size_t i = 0;
+
+    key_expansion(key, rk);
+    inv_key_expansion(rk, dk);
+    if (vaes_supported())
+        i = decrypt_x8_vaes(in, out, n, dk);
+    for (; i < n; i++)
+        _mm_storeu_si128((__m128i *)(out + 16 * i),
+                         decrypt_one(_mm_loadu_si128((const __m128i *)(in + 16 * i)), dk));
+}
+
+#elif defined(__aarch64__)
+
+#include <string.h>
+#include <arm_neon.h>
+#if defined(__linux__)
+#include <sys/auxv.h>
+#include <asm/hwcap.h>
+#endif
+
+/* Rcon cho key expansion AES-256 */
+static const uint32_t RCON[7] = { 0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40 };
+
+/* Trả về 1 nếu CPU hỗ trợ lệnh AES của ARMv8 */
+int hw_supported(void)
+{
+#if defined(__APPLE__)
+    return 1;
+#elif defined(__linux__)
+    return (getauxval(AT_HWCAP) & HWCAP_AES) != 0;
+#else
+    return 0;
+#endif
+}
+
+/*
+ * SubWord: nhân bản word ra 4 cột rồi dùng AESE với key = 0.
+ * Các cột giống nhau nên ShiftRows không làm thay đổi gì.
+ */
+static inline uint32_t sub_word(uint32_t w)
+{
+    uint8x16_t x = vreinterpretq_u8_u32(vdupq_n_u32(w));
+
+    x = vaeseq_u8(x, vdupq_n_u8(0));
+    return vgetq_lane_u32(vreinterpretq_u32_u8(x), 0);
+}
+
+/* Mở rộng khóa 256-bit thành 15 round keys (ARMv8 không có aeskeygenassist) */
+static void key_expansion(const uint8_t *key, uint8x16_t rk[15])
+{
+    uint32_t w[60];
+    uint32_t temp;
+    int i;
+
+    memcpy(w, key, 32);
+    for (i = 8; i < 60; i++) {
+        temp = w[i - 1];
+        if (i % 8 == 0) {
+            /* SubWord + RotWord (word little-endian → xoay phải 8 bit) + Rcon */
+            temp = sub_word(temp);
+            temp = ((temp >> 8) | (temp << 24)) ^ RCON[i / 8 - 1];
+        } else if (i % 8 == 4) {
+            temp = sub_word(temp);
+        }
+        w[i] = w[i - 8] ^ temp;
+    }
+    for (i = 0; i < 15; i++)
+        rk[i] = vld1q_u8((const uint8_t *)&w[4 * i]);
+}
+
+/* Round keys cho giải mã: áp dụng InvMixColumns cho rk[1..13] */
+static void inv_key_expansion(const uint8x16_t rk[15], uint8x16_t dk[15])
+{
+    int r;
+
+    dk[0] = rk[0];
+    for (r = 1; r < 14; r++)
+        dk[r] = vaesimcq_u8(rk[r]);
+    dk[14] = rk[14];
+}
+
+/*
+ * AESE = AddRoundKey + SubBytes + ShiftRows (AddRoundKey ở đầu, khác AES-NI),
+ * nên mỗi vòng dùng round key của vòng trước và XOR rk[14] ở cuối.
+ */
+static inline uint8x16_t encrypt_one(uint8x16_t x, const uint8x16_t rk[15])
+{
+    x = vaesmcq_u8(vaeseq_u8(x, rk[0]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[1]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[2]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[3]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[4]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[5]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[6]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[7]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[8]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[9]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[10]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[11]));
+    x = vaesmcq_u8(vaeseq_u8(x, rk[12]));
+    x = vaeseq_u8(x, rk[13]);
+    return veorq_u8(x, rk[14]);
+}
+
+/* AESD = AddRoundKey + InvSubBytes + InvShiftRows */
+static inline uint8x16_t decrypt_one(uint8x16_t x, const uint8x16_t dk[15])
+{
+    x = vaesimcq_u8(vaesdq_u8(x, dk[14]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[13]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[12]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[11]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[10]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[9]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[8]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[7]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[6]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[5]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[4]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[3]));
+    x = vaesimcq_u8(vaesdq_u8(x, dk[2]));
+    x = vaesdq_u8(x, dk[1]);
+    return veorq_u8(x, dk[0]);
+}
+
+/* Mã hóa 1 block 16 bytes */
+void encrypt_block(const uint8_t *pt, const uint8_t *key, uint8_t *out)
+{
+    uint8x16_t rk[15];
+
+    key_expansion(key, rk);
+    vst1q_u8(out, encrypt_one(vld1q_u8(pt), rk));
+}
+
+/* Giải mã 1 block 16 bytes (Equivalent Inverse Cipher) */
+void decrypt_block(const uint8_t *ct, const uint8_t *key, uint8_t *out)
+{
+    uint8x16_t rk[15], dk[15];
+
+    key_expansion(key, rk);
+    inv_key_expansion(rk, dk);
+    vst1q_u8(out, decrypt_one(vld1q_u8(ct), dk));
+}
+
+/* Mã hóa n block liên tiếp (ECB), key expansion chỉ chạy 1 lần */
+void encrypt_blocks(const uint8_t *in, size_t n, const uint8_t *key, uint8_t *out)
+{
+    uint8x16_t rk[15];
+    size_t i;
+
+    key_expansion(key, rk);
+    for (i = 0; i < n; i++)
+        vst1q_u8(out + 16 * i, encrypt_one(vld1q_u8(in + 16 * i), rk));
+}
+
+/* Giải mã n block liên tiếp (ECB), key expansion chỉ chạy 1 lần */
+void decrypt_blocks(const uint8_t *in, size_t n, const uint8_t *key, uint8_t *out)
+{
+    uint8x16_t rk[15], dk[15];
+    size_t i;
+
+    key_expansion(key, rk);
+    inv_key_expansion(rk, dk);
+    for (i = 0; i < n; i++)
+        vst1q_u8(out + 16 * i, decrypt_one(vld1q_u8(in + 16 * i), dk));
+}
+
+#else
+#error "_aes_hw.c cần CPU x86 (AES-NI) hoặc ARMv8 (Cryptography Extensions)"
+#endif
@@ -0,0 +1,193 @@
+"""
+AES-256 dùng T-tables, biên dịch JIT bằng Numba
+- Backend tùy chọn cho aes256.py khi không có _aes_hw.so, thư viện cryptography
+  và module Cython _aes_cy (import numba tốn ~0.2s nên aes256.py chỉ import
+  module này khi thật sự cần)
+- S-box và T-tables được tính lúc import (nghịch đảo GF(2^8) + biến đổi affine)
+"""
+
+import numpy as np
+from numba import njit
+
+
+def _gmul(a, b):
+    """Phép nhân trong trường Galois GF(2^8)"""
+    p = 0
+    for _ in range(8):
+        if b & 1:
+            p ^= a
+        a = ((a << 1) ^ (0x1b if a & 0x80 else 0)) & 0xFF
+        b >>= 1
+    return p
+
+
+def _build_tables():
+    """Tạo S-box, inverse S-box, Rcon và T-tables mã hóa/giải mã"""
+    rotl8 = lambda x, n: ((x << n) | (x >> (8 - n))) & 0xFF
+    ror8 = lambda w: (w >> 8) | ((w & 0xFF) << 24)
+
+    # S-box: p chạy qua mọi phần tử khác 0 (nhân 3), q = p^-1 (chia 3)
+    sbox = [0x63] * 256
+    p = q = 1
+    while True:
+        p = (p ^ (p << 1) ^ (0x1b if p & 0x80 else 0)) & 0xFF
+        q ^= (q << 1) & 0xFF
+        q ^= (q << 2) & 0xFF
+        q ^= (q << 4) & 0xFF
+        if q & 0x80:
+            q ^= 0x09
+        sbox[p] = q ^ rotl8(q, 1) ^ rotl8(q, 2) ^ rotl8(q, 3) ^ rotl8(q, 4) ^ 0x63
+        if p == 1:
+            break
+
+    inv_sbox = [0] * 256
+    for i, s in enumerate(sbox):
+        inv_sbox[s] = i
+
+    te = [[0] * 256 for _ in range(4)]
+    td = [[0] * 256 for _ in range(4)]
+    for i in range(256):
+        s = sbox[i]
+        te[0][i] = (_gmul(s, 2) << 24) | (s << 16) | (s << 8) | _gmul(s, 3)
+        s = inv_sbox[i]
+        td[0][i] = (_gmul(s, 14) << 24) | (_gmul(s, 9) << 16) | (_gmul(s, 13) << 8) | _gmul(s, 11)
+        for t in range(1, 4):
+            te[t][i] = ror8(te[t - 1][i])
+            td[t][i] = ror8(td[t - 1][i])
+
+    rcon = [1]
+    for _ in range(6):
+        rcon.append(_gmul(rcon[-1], 2))
+
+    return (np.array(sbox, dtype=np.int64), np.array(inv_sbox, dtype=np.int64),
+            np.array(rcon, dtype=np.int64), np.array(te, dtype=np.int64),
+            np.array(td, dtype=np.int64))
+
+
+_SBOX_NP, _INV_SBOX_NP, _RCON_NP, _TE_NP, _TD_NP = _build_tables()
+
+
+@njit(cache=True)
+def _nb_load_word(buf, off):
+    return (np.int64(buf[off]) << 24) | (np.int64(buf[off + 1]) << 16) | \
+           (np.int64(buf[off + 2]) << 8) | np.int64(buf[off + 3])
+
+
+@njit(cache=True)
+def _nb_store_word(buf, off, w):
+    buf[off] = (w >> 24) & 0xFF
+    buf[off + 1] = (w >> 16) & 0xFF
+    buf[off + 2] = (w >> 8) & 0xFF
+    buf[off + 3] = w & 0xFF
+
+
+@njit(cache=True)
+def _nb_key_words(key):
+    """Key expansion: 32 bytes (uint8) → 60 words 32-bit"""
+    w = np.empty(60, dtype=np.int64)
+    for i in range(8):
+        w[i] = _nb_load_word(key, 4 * i)
+    for i in range(8, 60):
+        t = w[i - 1]
+        if i % 8 == 0:
+            # RotWord + SubWord + Rcon
+            t = ((_SBOX_NP[(t >> 16) & 0xFF] << 24) | (_SBOX_NP[(t >> 8) & 0xFF] << 16) |
+                 (_SBOX_NP[t & 0xFF] << 8) | _SBOX_NP[t >> 24]) ^ (_RCON_NP[i // 8 - 1] << 24)
+        elif i % 8 == 4:
+            t = ((_SBOX_NP[t >> 24] << 24) | (_SBOX_NP[(t >> 16) & 0xFF] << 16) |
+                 (_SBOX_NP[(t >> 8) & 0xFF] << 8) | _SBOX_NP[t & 0xFF])
+        w[i] = w[i - 8] ^ t
+    return w
+
+
+@njit(cache=True)
+def _nb_inv_key_words(w):
+    """Round keys giải mã: InvMixColumns cho round key 1-13"""
+    dw = w.copy()
+    for i in range(4, 56):
+        t = w[i]
+        dw[i] = (_TD_NP[0, _SBOX_NP[t >> 24]] ^ _TD_NP[1, _SBOX_NP[(t >> 16) & 0xFF]] ^
+                 _TD_NP[2, _SBOX_NP[(t >> 8) & 0xFF]] ^ _TD_NP[3, _SBOX_NP[t & 0xFF]])
+    return dw
+
+
+@njit(cache=True)
+def _nb_encrypt_blocks(data, w, out):
+    """Mã hóa từng block 16 bytes của data (ECB) bằng T-tables"""
+    te0, te1, te2, te3 = _TE_NP[0], _TE_NP[1], _TE_NP[2], _TE_NP[3]
+    for off in range(0, data.size, 16):
+        s0 = _nb_load_word(data, off) ^ w[0]
+        s1 = _nb_load_word(data, off + 4) ^ w[1]
+        s2 = _nb_load_word(data, off + 8) ^ w[2]
+        s3 = _nb_load_word(data, off + 12) ^ w[3]
+        for k in range(4, 56, 4):
+            t0 = te0[s0 >> 24] ^ te1[(s1 >> 16) & 0xFF] ^ te2[(s2 >> 8) & 0xFF] ^ te3[s3 & 0xFF] ^ w[k]
+            t1 = te0[s1 >> 24] ^ te1[(s2 >> 16) & 0xFF] ^ te2[(s3 >> 8) & 0xFF] ^ te3[s0 & 0xFF] ^ w[k + 1]
+            t2 = te0[s2 >> 24] ^ te1[(s3 >> 16) & 0xFF] ^ te2[(s0 >> 8) & 0xFF] ^ te3[s1 & 0xFF] ^ w[k + 2]
+            t3 = te0[s3 >> 24] ^ te1[(s0 >> 16) & 0xFF] ^ te2[(s1 >> 8) & 0xFF] ^ te3[s2 & 0xFF] ^ w[k + 3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+        sb = _SBOX_NP
+        _nb_store_word(out, off, ((sb[s0 >> 24] << 24) | (sb[(s1 >> 16) & 0xFF] << 16) |
+                                  (sb[(s2 >> 8) & 0xFF] << 8) | sb[s3 & 0xFF]) ^ w[56])
+        _nb_store_word(out, off + 4, ((sb[s1 >> 24] << 24) | (sb[(s2 >> 16) & 0xFF] << 16) |
+                                      (sb[(s3 >> 8) & 0xFF] << 8) | sb[s0 & 0xFF]) ^ w[57])
+        _nb_store_word(out, off + 8, ((sb[s2 >> 24] << 24) | (sb[(s3 >> 16) & 0xFF] << 16) |
+                                      (sb[(s0 >> 8) & 0xFF] << 8) | sb[s1 & 0xFF]) ^ w[58])
+        _nb_store_word(out, off + 12, ((sb[s3 >> 24] << 24) | (sb[(s0 >> 16) & 0xFF] << 16) |
+                                       (sb[(s1 >> 8) & 0xFF] << 8) | sb[s2 & 0xFF]) ^ w[59])
+
+
+@njit(cache=True)
+def _nb_decrypt_blocks(data, dw, out):
+    """Giải mã từng block 16 bytes của data (ECB) bằng T-tables"""
+    td0, td1, td2, td3 = _TD_NP[0], _TD_NP[1], _TD_NP[2], _TD_NP[3]
+    for off in range(0, data.size, 16):
+        s0 = _nb_load_word(data, off) ^ dw[56]
+        s1 = _nb_load_word(data, off + 4) ^ dw[57]
+        s2 = _nb_load_word(data, off + 8) ^ dw[58]
+        s3 = _nb_load_word(data, off + 12) ^ dw[59]
+        for k in range(52, 0, -4):
+            t0 = td0[s0 >> 24] ^ td1[(s3 >> 16) & 0xFF] ^ td2[(s2 >> 8) & 0xFF] ^ td3[s1 & 0xFF] ^ dw[k]
+            t1 = td0[s1 >> 24] ^ td1[(s0 >> 16) & 0xFF] ^ td2[(s3 >> 8) & 0xFF] ^ td3[s2 & 0xFF] ^ dw[k + 1]
+            t2 = td0[s2 >> 24] ^ td1[(s1 >> 16) & 0xFF] ^ td2[(s0 >> 8) & 0xFF] ^ td3[s3 & 0xFF] ^ dw[k + 2]
+            t3 = td0[s3 >> 24] ^ td1[(s2 >> 16) & 0xFF] ^ td2[(s1 >> 8) & 0xFF] ^ td3[s0 & 0xFF] ^ dw[k + 3]
+            s0, s1, s2, s3 = t0, t1, t2, t3
+        sb = _INV_SBOX_NP
+        _nb_store_word(out, off, ((sb[s0 >> 24] << 24) | (sb[(s3 >> 16) & 0xFF] << 16) |
+                                  (sb[(s2 >> 8) & 0xFF] << 8) | sb[s1 & 0xFF]) ^ dw[0])
+        _nb_store_word(out, off + 4, ((sb[s1 >> 24] << 24) | (sb[(s0 >> 16) & 0xFF] << 16) |
+                                      (sb[(s3 >> 8) & 0xFF] << 8) | sb[s2 & 0xFF]) ^ dw[1])
+        _nb_store_word(out, off + 8, ((sb[s2 >> 24] << 24) | (sb[(s1 >> 16) & 0xFF] << 16) |
+                                      (sb[(s0 >> 8) & 0xFF] << 8) | sb[s3 & 0xFF]) ^ dw[2])
+        _nb_store_word(out, off + 12, ((sb[s3 >> 24] << 24) | (sb[(s2 >> 16) & 0xFF] << 16) |
+                                       (sb[(s1 >> 8) & 0xFF] << 8) | sb[s0 & 0xFF]) ^ dw[3])
+
+
+def encrypt_blocks_into(data, key, out_view):
+    """
+    Mã hóa data (bội số của 16 bytes) ở chế độ ECB, ghi thẳng vào out_view
+    (buffer ghi được, ví dụ memoryview trên bytearray, cùng độ dài với data)
+    """
+    w = _nb_key_words(np.frombuffer(bytes(key), dtype=np.uint8))
+    _nb_encrypt_blocks(np.frombuffer(data, dtype=np.uint8), w,
+                       np.frombuffer(out_view, dtype=np.uint8))
+
+
+def encrypt_blocks(data, key):
+    """
+    Mã hóa data (bội số của 16 bytes) ở chế độ ECB với key 32 bytes
+    """
+    out = bytearray(len(data))
+    encrypt_blocks_into(data, key, out)
+    return bytes(out)
+
+
+def decrypt_blocks(data, key):
+    """
+    Giải mã data (bội số của 16 bytes) ở chế độ ECB với key 32 bytes
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    out = np.empty_like(buf)
+    w = _nb_key_words(np.frombuffer(bytes(key), dtype=np.uint8))
+    _nb_decrypt_blocks(buf, _nb_inv_key_words(w), out)
+    return out.tobytes()
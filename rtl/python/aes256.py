@@ -4,10 +4,31 @@ Thuật toán mã hóa AES-256 chuẩn FIPS-197
 - Plaintext: 128-bit (16 bytes)
 - Key: 256-bit (32 bytes)
 - Rounds: 14 (thay vì 10 như AES-128)
+- Tự động dùng lệnh AES phần cứng (_aes_hw.so: AES-NI/VAES trên x86,
+  Cryptography Extensions trên ARMv8) nếu có, nếu không thì dùng thư viện
+  cryptography (OpenSSL), module Cython _aes_cy (nếu đã build), Numba (nếu
+  đã cài numpy + numba), cuối cùng là code Python thuần
 """
 
+import ctypes
+import functools
+import operator
+import os
+import struct
+
+try:
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:
+    Cipher = None
+
+try:
+    import _aes_cy
+except ImportError:
+    _aes_cy = None
+
 # S-box cho SubBytes (giống AES-128)
-SBOX = [
+# Lưu dạng bytes: tra bảng nhanh hơn list và dùng trực tiếp được với bytes.translate
+SBOX = bytes((
     0x63, 0x7c, 0x77, 0x7b, 0xf2, 0x6b, 0x6f, 0xc5, 0x30, 0x01, 0x67, 0x2b, 0xfe, 0xd7, 0xab, 0x76,
     0xca, 0x82, 0xc9, 0x7d, 0xfa, 0x59, 0x47, 0xf0, 0xad, 0xd4, 0xa2, 0xaf, 0x9c, 0xa4, 0x72, 0xc0,
     0xb7, 0xfd, 0x93, 0x26, 0x36, 0x3f, 0xf7, 0xcc, 0x34, 0xa5, 0xe5, 0xf1, 0x71, 0xd8, 0x31, 0x15,
@@ -24,10 +45,10 @@ SBOX = [
     0x70, 0x3e, 0xb5, 0x66, 0x48, 0x03, 0xf6, 0x0e, 0x61, 0x35, 0x57, 0xb9, 0x86, 0xc1, 0x1d, 0x9e,
     0xe1, 0xf8, 0x98, 0x11, 0x69, 0xd9, 0x8e, 0x94, 0x9b, 0x1e, 0x87, 0xe9, 0xce, 0x55, 0x28, 0xdf,
     0x8c, 0xa1, 0x89, 0x0d, 0xbf, 0xe6, 0x42, 0x68, 0x41, 0x99, 0x2d, 0x0f, 0xb0, 0x54, 0xbb, 0x16
-]
+))
 
 # Inverse S-box cho giải mã (giống AES-128)
-INV_SBOX = [
+INV_SBOX = bytes((
     0x52, 0x09, 0x6a, 0xd5, 0x30, 0x36, 0xa5, 0x38, 0xbf, 0x40, 0xa3, 0x9e, 0x81, 0xf3, 0xd7, 0xfb,
     0x7c, 0xe3, 0x39, 0x82, 0x9b, 0x2f, 0xff, 0x87, 0x34, 0x8e, 0x43, 0x44, 0xc4, 0xde, 0xe9, 0xcb,
     0x54, 0x7b, 0x94, 0x32, 0xa6, 0xc2, 0x23, 0x3d, 0xee, 0x4c, 0x95, 0x0b, 0x42, 0xfa, 0xc3, 0x4e,
@@ -44,38 +65,162 @@ INV_SBOX = [
     0x60, 0x51, 0x7f, 0xa9, 0x19, 0xb5, 0x4a, 0x0d, 0x2d, 0xe5, 0x7a, 0x9f, 0x93, 0xc9, 0x9c, 0xef,
     0xa0, 0xe0, 0x3b, 0x4d, 0xae, 0x2a, 0xf5, 0xb0, 0xc8, 0xeb, 0xbb, 0x3c, 0x83, 0x53, 0x99, 0x61,
     0x17, 0x2b, 0x04, 0x7e, 0xba, 0x77, 0xd6, 0x26, 0xe1, 0x69, 0x14, 0x63, 0x55, 0x21, 0x0c, 0x7d
-]
+))
 
 # Rcon cho key expansion AES-256 (cần 14 giá trị)
-RCON = [
+RCON = bytes((
     0x01, 0x02, 0x04, 0x08, 0x10, 0x20, 0x40, 0x80, 0x1b, 0x36, 0x6c, 0xd8, 0xab, 0x4d
-]
+))
+
+
+def _load_aes_hw():
+    """
+    Nạp thư viện AES phần cứng (_aes_hw.so) nằm cùng thư mục nếu đã được build
+    và CPU hỗ trợ lệnh AES (AES-NI hoặc ARMv8). Trả về None nếu không dùng được.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '_aes_hw.so')
+    try:
+        lib = ctypes.CDLL(path)
+    except OSError:
+        return None
+    if not lib.hw_supported():
+        return None
+    # Mã hóa/giải mã nhiều block một lần (x86: VAES nếu CPU hỗ trợ, ngược lại AES-NI)
+    for func in (lib.encrypt_blocks, lib.decrypt_blocks):
+        func.argtypes = [ctypes.c_char_p, ctypes.c_size_t, ctypes.c_char_p, ctypes.c_char_p]
+        func.restype = None
+    return lib
+
+
+_aes_hw = _load_aes_hw()
+
+# Thư viện cryptography (PyCA): OpenSSL tự dùng AES-NI/ARMv8 khi mã hóa
+_USE_PYCA = Cipher is not None
+
+
+def _pyca_encrypt(data, key):
+    """
+    Mã hóa data (bội số của 16 bytes, ECB) bằng OpenSSL trong 1 lần gọi update()
+    """
+    encryptor = Cipher(algorithms.AES(bytes(key)), modes.ECB()).encryptor()
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def _pyca_encrypt_into(data, key, out, offset):
+    """
+    Như _pyca_encrypt nhưng ghi thẳng vào out[offset:] bằng update_into().
+    update_into() cần out dư ít nhất 15 bytes sau kết quả, nếu không đủ thì
+    dùng update() rồi copy vào out
+    """
+    encryptor = Cipher(algorithms.AES(bytes(key)), modes.ECB()).encryptor()
+    if len(out) - offset >= len(data) + 15:
+        encryptor.update_into(data, memoryview(out)[offset:])
+    else:
+        out[offset:offset+len(data)] = encryptor.update(data)
+
+
+def _pyca_decrypt(data, key):
+    """
+    Giải mã data (bội số của 16 bytes, ECB) bằng OpenSSL trong 1 lần gọi update()
+    """
+    decryptor = Cipher(algorithms.AES(bytes(key)), modes.ECB()).decryptor()
+    return decryptor.update(data) + decryptor.finalize()
 
 
 def gmul(a, b):
     """
     Phép nhân trong trường Galois GF(2^8)
     Sử dụng cho MixColumns
+    Không rẽ nhánh: dùng mask -(bit) thay cho if, vòng lặp 8 bit được trải phẳng
+    (Polynomial x^8 + x^4 + x^3 + x + 1 → 0x1b)
+    """
+    p = a & -(b & 1)
+    a = ((a << 1) & 0xFF) ^ (0x1b & -(a >> 7))
+    p ^= a & -((b >> 1) & 1)
+    a = ((a << 1) & 0xFF) ^ (0x1b & -(a >> 7))
+    p ^= a & -((b >> 2) & 1)
+    a = ((a << 1) & 0xFF) ^ (0x1b & -(a >> 7))
+    p ^= a & -((b >> 3) & 1)
+    a = ((a << 1) & 0xFF) ^ (0x1b & -(a >> 7))
+    p ^= a & -((b >> 4) & 1)
+    a = ((a << 1) & 0xFF) ^ (0x1b & -(a >> 7))
+    p ^= a & -((b >> 5) & 1)
+    a = ((a << 1) & 0xFF) ^ (0x1b & -(a >> 7))
+    p ^= a & -((b >> 6) & 1)
+    a = ((a << 1) & 0xFF) ^ (0x1b & -(a >> 7))
+    p ^= a & -((b >> 7) & 1)
+    return p
+
+
+# Bảng nhân sẵn với các hệ số của MixColumns / InvMixColumns
+MUL2 = [gmul(x, 2) for x in range(256)]
+MUL3 = [gmul(x, 3) for x in range(256)]
+MUL9 = [gmul(x, 9) for x in range(256)]
+MUL11 = [gmul(x, 11) for x in range(256)]
+MUL13 = [gmul(x, 13) for x in range(256)]
+MUL14 = [gmul(x, 14) for x in range(256)]
+
+
+def _build_t_tables():
+    """
+    Tạo T-tables: gộp SubBytes + ShiftRows + MixColumns thành tra bảng theo cột
+    Mỗi cột state được biểu diễn bằng 1 số nguyên 32-bit (hàng 0 là byte cao nhất)
+
+    TE0[x] = (2·S[x], S[x], S[x], 3·S[x]),  TE1..TE3 là TE0 xoay phải 8/16/24 bit
+    TD0[x] = (14·Si[x], 9·Si[x], 13·Si[x], 11·Si[x]),  TD1..TD3 tương tự
+    """
+    def ror8(w):
+        return ((w >> 8) | (w << 24)) & 0xFFFFFFFF
+
+    te0, td0 = [], []
+    for x in range(256):
+        s = SBOX[x]
+        te0.append((MUL2[s] << 24) | (s << 16) | (s << 8) | MUL3[s])
+        s = INV_SBOX[x]
+        td0.append((MUL14[s] << 24) | (MUL9[s] << 16) | (MUL13[s] << 8) | MUL11[s])
+
+    te = [te0]
+    td = [td0]
+    for _ in range(3):
+        te.append([ror8(w) for w in te[-1]])
+        td.append([ror8(w) for w in td[-1]])
+    return te, td
+
+
+(TE0, TE1, TE2, TE3), (TD0, TD1, TD2, TD3) = _build_t_tables()
+
+
+# Numba: import numba tốn ~0.2s nên chỉ nạp _aes_numba khi không có backend nào phía trước
+def _load_aes_numba():
     """
-    p = 0
-    for _ in range(8):
-        if b & 1:
-            p ^= a
-        hi_bit_set = a & 0x80
-        a <<= 1
-        if hi_bit_set:
-            a ^= 0x1b  # Polynomial x^8 + x^4 + x^3 + x + 1
-        b >>= 1
-    return p & 0xFF
+    Nạp module _aes_numba (cần numpy + numba). Trả về None nếu không dùng được.
+    """
+    try:
+        import _aes_numba
+    except ImportError:
+        return None
+    return _aes_numba
+
+
+_aes_numba = None
+if _aes_hw is None and not _USE_PYCA and _aes_cy is None:
+    _aes_numba = _load_aes_numba()
+
+
+# Hoán vị ShiftRows trên state phẳng 16 bytes (byte thứ 4*c + r = hàng r, cột c)
+SHIFT_ROWS = (0, 5, 10, 15, 4, 9, 14, 3, 8, 13, 2, 7, 12, 1, 6, 11)
+INV_SHIFT_ROWS = (0, 13, 10, 7, 4, 1, 14, 11, 8, 5, 2, 15, 12, 9, 6, 3)
+
+# Lấy 16 byte theo hoán vị trong 1 lần gọi C (không tạo list/generator trung gian)
+_shift_rows_get = operator.itemgetter(*SHIFT_ROWS)
+_inv_shift_rows_get = operator.itemgetter(*INV_SHIFT_ROWS)
 
 
 def sub_bytes(state):
     """
     SubBytes transformation: thay thế mỗi byte bằng S-box
     """
-    for i in range(4):
-        for j in range(4):
-            state[i][j] = SBOX[state[i][j]]
+    state[:] = state.translate(SBOX)
     return state
 
 
@@ -83,138 +228,289 @@ def inv_sub_bytes(state):
     """
     Inverse SubBytes transformation
     """
-    for i in range(4):
-        for j in range(4):
-            state[i][j] = INV_SBOX[state[i][j]]
+    state[:] = state.translate(INV_SBOX)
     return state
 
 
 def shift_rows(state):
     """
-    ShiftRows transformation: dịch các hàng
+    ShiftRows transformation: dịch trái hàng r đi r byte
     """
-    state[1] = state[1][1:] + state[1][:1]  # Dịch trái 1
-    state[2] = state[2][2:] + state[2][:2]  # Dịch trái 2
-    state[3] = state[3][3:] + state[3][:3]  # Dịch trái 3
+    state[:] = bytes(_shift_rows_get(state))
     return state
 
 
 def inv_shift_rows(state):
     """
-    Inverse ShiftRows transformation: dịch phải
+    Inverse ShiftRows transformation: dịch phải hàng r đi r byte
     """
-    state[1] = state[1][-1:] + state[1][:-1]  # Dịch phải 1
-    state[2] = state[2][-2:] + state[2][:-2]  # Dịch phải 2
-    state[3] = state[3][-3:] + state[3][:-3]  # Dịch phải 3
+    state[:] = bytes(_inv_shift_rows_get(state))
     return state
 
 
 def mix_columns(state):
     """
     MixColumns transformation: trộn dữ liệu các cột
-    """
-    for i in range(4):
-        col = [state[j][i] for j in range(4)]
-        state[0][i] = gmul(col[0], 2) ^ gmul(col[1], 3) ^ col[2] ^ col[3]
-        state[1][i] = col[0] ^ gmul(col[1], 2) ^ gmul(col[2], 3) ^ col[3]
-        state[2][i] = col[0] ^ col[1] ^ gmul(col[2], 2) ^ gmul(col[3], 3)
-        state[3][i] = gmul(col[0], 3) ^ col[1] ^ col[2] ^ gmul(col[3], 2)
+    - Đọc 16 byte 1 lần, ghi lại 1 lần (không lặp và gán từng byte)
+    """
+    a0, a1, a2, a3, b0, b1, b2, b3, c0, c1, c2, c3, d0, d1, d2, d3 = state
+    state[:] = bytes((
+        MUL2[a0] ^ MUL3[a1] ^ a2 ^ a3, a0 ^ MUL2[a1] ^ MUL3[a2] ^ a3,
+        a0 ^ a1 ^ MUL2[a2] ^ MUL3[a3], MUL3[a0] ^ a1 ^ a2 ^ MUL2[a3],
+        MUL2[b0] ^ MUL3[b1] ^ b2 ^ b3, b0 ^ MUL2[b1] ^ MUL3[b2] ^ b3,
+        b0 ^ b1 ^ MUL2[b2] ^ MUL3[b3], MUL3[b0] ^ b1 ^ b2 ^ MUL2[b3],
+        MUL2[c0] ^ MUL3[c1] ^ c2 ^ c3, c0 ^ MUL2[c1] ^ MUL3[c2] ^ c3,
+        c0 ^ c1 ^ MUL2[c2] ^ MUL3[c3], MUL3[c0] ^ c1 ^ c2 ^ MUL2[c3],
+        MUL2[d0] ^ MUL3[d1] ^ d2 ^ d3, d0 ^ MUL2[d1] ^ MUL3[d2] ^ d3,
+        d0 ^ d1 ^ MUL2[d2] ^ MUL3[d3], MUL3[d0] ^ d1 ^ d2 ^ MUL2[d3]))
     return state
 
 
 def inv_mix_columns(state):
     """
     Inverse MixColumns transformation
-    """
-    for i in range(4):
-        col = [state[j][i] for j in range(4)]
-        state[0][i] = gmul(col[0], 14) ^ gmul(col[1], 11) ^ gmul(col[2], 13) ^ gmul(col[3], 9)
-        state[1][i] = gmul(col[0], 9) ^ gmul(col[1], 14) ^ gmul(col[2], 11) ^ gmul(col[3], 13)
-        state[2][i] = gmul(col[0], 13) ^ gmul(col[1], 9) ^ gmul(col[2], 14) ^ gmul(col[3], 11)
-        state[3][i] = gmul(col[0], 11) ^ gmul(col[1], 13) ^ gmul(col[2], 9) ^ gmul(col[3], 14)
+    - Đọc 16 byte 1 lần, ghi lại 1 lần như mix_columns
+    """
+    a0, a1, a2, a3, b0, b1, b2, b3, c0, c1, c2, c3, d0, d1, d2, d3 = state
+    state[:] = bytes((
+        MUL14[a0] ^ MUL11[a1] ^ MUL13[a2] ^ MUL9[a3], MUL9[a0] ^ MUL14[a1] ^ MUL11[a2] ^ MUL13[a3],
+        MUL13[a0] ^ MUL9[a1] ^ MUL14[a2] ^ MUL11[a3], MUL11[a0] ^ MUL13[a1] ^ MUL9[a2] ^ MUL14[a3],
+        MUL14[b0] ^ MUL11[b1] ^ MUL13[b2] ^ MUL9[b3], MUL9[b0] ^ MUL14[b1] ^ MUL11[b2] ^ MUL13[b3],
+        MUL13[b0] ^ MUL9[b1] ^ MUL14[b2] ^ MUL11[b3], MUL11[b0] ^ MUL13[b1] ^ MUL9[b2] ^ MUL14[b3],
+        MUL14[c0] ^ MUL11[c1] ^ MUL13[c2] ^ MUL9[c3], MUL9[c0] ^ MUL14[c1] ^ MUL11[c2] ^ MUL13[c3],
+        MUL13[c0] ^ MUL9[c1] ^ MUL14[c2] ^ MUL11[c3], MUL11[c0] ^ MUL13[c1] ^ MUL9[c2] ^ MUL14[c3],
+        MUL14[d0] ^ MUL11[d1] ^ MUL13[d2] ^ MUL9[d3], MUL9[d0] ^ MUL14[d1] ^ MUL11[d2] ^ MUL13[d3],
+        MUL13[d0] ^ MUL9[d1] ^ MUL14[d2] ^ MUL11[d3], MUL11[d0] ^ MUL13[d1] ^ MUL9[d2] ^ MUL14[d3]))
     return state
 
 
 def add_round_key(state, round_key):
     """
     AddRoundKey transformation: XOR state với round key
+    - XOR qua số nguyên 128-bit (vài lệnh C thay vì 16 vòng lặp Python)
     """
-    for i in range(4):
-        for j in range(4):
-            state[i][j] ^= round_key[i][j]
+    x = int.from_bytes(state, 'big') ^ int.from_bytes(round_key, 'big')
+    state[:] = x.to_bytes(16, 'big')
     return state
 
 
 def key_expansion(key):
     """
     Key Expansion cho AES-256: mở rộng khóa 256-bit thành 15 round keys
-    Mỗi round key là 128-bit (4x4 bytes)
+    Mỗi round key là 128-bit (16 bytes)
     
     AES-256 có 14 rounds → cần 15 round keys (0-14)
     Tổng số words cần: 4 * 15 = 60 words
+    
+    Returns:
+        bytearray 240 bytes; round key r là w[16*r : 16*r + 16]
     """
-    # Chuyển key thành dạng words (mỗi word = 4 bytes)
-    # Key 256-bit = 32 bytes = 8 words
-    key_words = []
-    for i in range(8):
-        word = [key[4*i], key[4*i+1], key[4*i+2], key[4*i+3]]
-        key_words.append(word)
+    # 8 words đầu tiên chính là key 256-bit (32 bytes)
+    w = bytearray(240)
+    w[0:32] = key
     
-    # Mở rộng thành 60 words (15 round keys x 4 words)
+    # Mở rộng thành 60 words (15 round keys x 4 words), ghi thẳng vào w
     for i in range(8, 60):
-        temp = key_words[i-1][:]
+        off = 4 * i
         
         if i % 8 == 0:
-            # RotWord: xoay trái 1 byte
-            temp = temp[1:] + temp[:1]
-            
-            # SubWord: áp dụng S-box
-            temp = [SBOX[b] for b in temp]
-            
-            # XOR với Rcon
-            temp[0] ^= RCON[i//8 - 1]
+            # RotWord + SubWord + XOR với Rcon
+            t0 = SBOX[w[off-3]] ^ RCON[i//8 - 1]
+            t1 = SBOX[w[off-2]]
+            t2 = SBOX[w[off-1]]
+            t3 = SBOX[w[off-4]]
         
         elif i % 8 == 4:
             # Đặc biệt cho AES-256: SubWord (không có RotWord)
-            temp = [SBOX[b] for b in temp]
+            t0 = SBOX[w[off-4]]
+            t1 = SBOX[w[off-3]]
+            t2 = SBOX[w[off-2]]
+            t3 = SBOX[w[off-1]]
+        
+        else:
+            t0, t1, t2, t3 = w[off-4], w[off-3], w[off-2], w[off-1]
         
         # XOR với word trước đó 8 vị trí
-        new_word = [key_words[i-8][j] ^ temp[j] for j in range(4)]
-        key_words.append(new_word)
+        w[off] = w[off-32] ^ t0
+        w[off+1] = w[off-31] ^ t1
+        w[off+2] = w[off-30] ^ t2
+        w[off+3] = w[off-29] ^ t3
     
-    # Tạo 15 round keys
-    round_keys = []
-    for i in range(15):
-        round_key = [[0 for _ in range(4)] for _ in range(4)]
-        for j in range(4):
-            word = key_words[i*4 + j]
-            for k in range(4):
-                round_key[k][j] = word[k]
-        round_keys.append(round_key)
+    return w
+
+
+@functools.lru_cache(maxsize=4)
+def _expand(key):
+    """
+    Key expansion dạng 60 words 32-bit (mỗi round key = 4 words, 1 word = 1 cột)
+    Kết quả được cache theo key (bytes) để các block sau không phải mở rộng lại
+    """
+    w = key_expansion(key)
+    return tuple(int.from_bytes(w[i:i+4], 'big') for i in range(0, 240, 4))
+
+
+@functools.lru_cache(maxsize=4)
+def _expand_inv(key):
+    """
+    Round keys cho giải mã bằng T-tables (Equivalent Inverse Cipher):
+    áp dụng InvMixColumns cho round key 1-13
+    """
+    words = _expand(key)
+    dwords = list(words)
+    for i in range(4, 56):
+        w = words[i]
+        dwords[i] = (TD0[SBOX[w >> 24]] ^ TD1[SBOX[(w >> 16) & 0xFF]] ^
+                     TD2[SBOX[(w >> 8) & 0xFF]] ^ TD3[SBOX[w & 0xFF]])
+    return tuple(dwords)
+
+
+def _encrypt_block_rk(plaintext, w):
+    """
+    Mã hóa 1 block bằng T-tables với round keys dạng words (từ _expand)
+    """
+    # Vòng đầu tiên: chỉ có AddRoundKey (đọc block 1 lần thành số nguyên 128-bit)
+    x = int.from_bytes(plaintext, 'big')
+    s0 = (x >> 96) ^ w[0]
+    s1 = ((x >> 64) & 0xFFFFFFFF) ^ w[1]
+    s2 = ((x >> 32) & 0xFFFFFFFF) ^ w[2]
+    s3 = (x & 0xFFFFFFFF) ^ w[3]
+
+    # 13 vòng tiếp theo: SubBytes + ShiftRows + MixColumns + AddRoundKey
+    for k in range(4, 56, 4):
+        t0 = TE0[s0 >> 24] ^ TE1[(s1 >> 16) & 0xFF] ^ TE2[(s2 >> 8) & 0xFF] ^ TE3[s3 & 0xFF] ^ w[k]
+        t1 = TE0[s1 >> 24] ^ TE1[(s2 >> 16) & 0xFF] ^ TE2[(s3 >> 8) & 0xFF] ^ TE3[s0 & 0xFF] ^ w[k + 1]
+        t2 = TE0[s2 >> 24] ^ TE1[(s3 >> 16) & 0xFF] ^ TE2[(s0 >> 8) & 0xFF] ^ TE3[s1 & 0xFF] ^ w[k + 2]
+        t3 = TE0[s3 >> 24] ^ TE1[(s0 >> 16) & 0xFF] ^ TE2[(s1 >> 8) & 0xFF] ^ TE3[s2 & 0xFF] ^ w[k + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+
+    # Vòng cuối: không có MixColumns
+    t0 = ((SBOX[s0 >> 24] << 24) | (SBOX[(s1 >> 16) & 0xFF] << 16) |
+          (SBOX[(s2 >> 8) & 0xFF] << 8) | SBOX[s3 & 0xFF]) ^ w[56]
+    t1 = ((SBOX[s1 >> 24] << 24) | (SBOX[(s2 >> 16) & 0xFF] << 16) |
+          (SBOX[(s3 >> 8) & 0xFF] << 8) | SBOX[s0 & 0xFF]) ^ w[57]
+    t2 = ((SBOX[s2 >> 24] << 24) | (SBOX[(s3 >> 16) & 0xFF] << 16) |
+          (SBOX[(s0 >> 8) & 0xFF] << 8) | SBOX[s1 & 0xFF]) ^ w[58]
+    t3 = ((SBOX[s3 >> 24] << 24) | (SBOX[(s0 >> 16) & 0xFF] << 16) |
+          (SBOX[(s1 >> 8) & 0xFF] << 8) | SBOX[s2 & 0xFF]) ^ w[59]
+
+    return ((t0 << 96) | (t1 << 64) | (t2 << 32) | t3).to_bytes(16, 'big')
+
+
+def _decrypt_block_rk(ciphertext, dw):
+    """
+    Giải mã 1 block bằng T-tables với round keys giải mã (từ _expand_inv)
+    """
+    # Vòng đầu tiên: AddRoundKey với round key cuối
+    x = int.from_bytes(ciphertext, 'big')
+    s0 = (x >> 96) ^ dw[56]
+    s1 = ((x >> 64) & 0xFFFFFFFF) ^ dw[57]
+    s2 = ((x >> 32) & 0xFFFFFFFF) ^ dw[58]
+    s3 = (x & 0xFFFFFFFF) ^ dw[59]
+
+    # 13 vòng tiếp theo: InvShiftRows + InvSubBytes + InvMixColumns + AddRoundKey
+    for k in range(52, 0, -4):
+        t0 = TD0[s0 >> 24] ^ TD1[(s3 >> 16) & 0xFF] ^ TD2[(s2 >> 8) & 0xFF] ^ TD3[s1 & 0xFF] ^ dw[k]
+        t1 = TD0[s1 >> 24] ^ TD1[(s0 >> 16) & 0xFF] ^ TD2[(s3 >> 8) & 0xFF] ^ TD3[s2 & 0xFF] ^ dw[k + 1]
+        t2 = TD0[s2 >> 24] ^ TD1[(s1 >> 16) & 0xFF] ^ TD2[(s0 >> 8) & 0xFF] ^ TD3[s3 & 0xFF] ^ dw[k + 2]
+        t3 = TD0[s3 >> 24] ^ TD1[(s2 >> 16) & 0xFF] ^ TD2[(s1 >> 8) & 0xFF] ^ TD3[s0 & 0xFF] ^ dw[k + 3]
+        s0, s1, s2, s3 = t0, t1, t2, t3
+
+    # Vòng cuối: không có InvMixColumns
+    t0 = ((INV_SBOX[s0 >> 24] << 24) | (INV_SBOX[(s3 >> 16) & 0xFF] << 16) |
+          (INV_SBOX[(s2 >> 8) & 0xFF] << 8) | INV_SBOX[s1 & 0xFF]) ^ dw[0]
+    t1 = ((INV_SBOX[s1 >> 24] << 24) | (INV_SBOX[(s0 >> 16) & 0xFF] << 16) |
+          (INV_SBOX[(s3 >> 8) & 0xFF] << 8) | INV_SBOX[s2 & 0xFF]) ^ dw[1]
+    t2 = ((INV_SBOX[s2 >> 24] << 24) | (INV_SBOX[(s1 >> 16) & 0xFF] << 16) |
+          (INV_SBOX[(s0 >> 8) & 0xFF] << 8) | INV_SBOX[s3 & 0xFF]) ^ dw[2]
+    t3 = ((INV_SBOX[s3 >> 24] << 24) | (INV_SBOX[(s2 >> 16) & 0xFF] << 16) |
+          (INV_SBOX[(s1 >> 8) & 0xFF] << 8) | INV_SBOX[s0 & 0xFF]) ^ dw[3]
+
+    return ((t0 << 96) | (t1 << 64) | (t2 << 32) | t3).to_bytes(16, 'big')
+
+
+def _ecb_encrypt_into(data, n_blocks, key, out, offset=0):
+    """
+    Mã hóa n_blocks block đầu tiên của data ở chế độ ECB, ghi thẳng vào
+    out[offset:] (bytearray) bằng backend nhanh nhất có sẵn:
+    AES phần cứng → cryptography → Cython → Numba → T-tables Python thuần
+    """
+    size = 16 * n_blocks
+    if size == 0:
+        return
+    
+    # Dùng AES phần cứng: đọc thẳng từ data, ghi thẳng vào out
+    if _aes_hw is not None:
+        src = data if isinstance(data, bytes) else bytes(data[:size])
+        dst = (ctypes.c_char * size).from_buffer(out, offset)
+        _aes_hw.encrypt_blocks(src, n_blocks, bytes(key), dst)
+        return
+    
+    src = memoryview(data)[:size]
+    
+    # Dùng thư viện cryptography: mã hóa toàn bộ buffer trong 1 lần gọi
+    if _USE_PYCA:
+        _pyca_encrypt_into(src, key, out, offset)
+        return
     
-    return round_keys
+    # Dùng module Cython đã biên dịch: ghi thẳng vào out
+    if _aes_cy is not None:
+        _aes_cy.encrypt_blocks(src, bytes(key), out, offset)
+        return
+    
+    # Dùng module Numba (JIT): kernel ghi thẳng vào out
+    if _aes_numba is not None:
+        _aes_numba.encrypt_blocks_into(src, key, memoryview(out)[offset:offset+size])
+        return
+    
+    # Mở rộng khóa 1 lần cho tất cả các block
+    round_keys = _expand(bytes(key))
+    
+    # Mã hóa từng block, ghi thẳng vào out
+    for i in range(0, size, 16):
+        out[offset+i:offset+i+16] = _encrypt_block_rk(src[i:i+16], round_keys)
 
 
-def bytes_to_state(data):
+def _ecb_encrypt(data, key):
     """
-    Chuyển 16 bytes thành ma trận state 4x4
+    Mã hóa data (bội số của 16 bytes) ở chế độ ECB
     """
-    state = [[0 for _ in range(4)] for _ in range(4)]
-    for i in range(4):
-        for j in range(4):
-            state[j][i] = data[i*4 + j]
-    return state
+    out = bytearray(len(data))
+    _ecb_encrypt_into(data, len(data) // 16, key, out)
+    return bytes(out)
 
 
-def state_to_bytes(state):
+def _ecb_decrypt(data, key):
     """
-    Chuyển ma trận state 4x4 thành 16 bytes
+    Giải mã data (bội số của 16 bytes) ở chế độ ECB bằng backend nhanh nhất có sẵn
     """
-    data = []
-    for i in range(4):
-        for j in range(4):
-            data.append(state[j][i])
-    return bytes(data)
+    # Dùng AES phần cứng: giải mã toàn bộ buffer trong 1 lần gọi
+    if _aes_hw is not None:
+        out = ctypes.create_string_buffer(len(data))
+        _aes_hw.decrypt_blocks(bytes(data), len(data) // 16, bytes(key), out)
+        return out.raw
+    
+    # Dùng thư viện cryptography: giải mã toàn bộ buffer trong 1 lần gọi
+    if _USE_PYCA:
+        return _pyca_decrypt(data, key)
+    
+    # Dùng module Cython đã biên dịch
+    if _aes_cy is not None:
+        return _aes_cy.decrypt_blocks(bytes(data), bytes(key))
+    
+    # Dùng module Numba (JIT)
+    if _aes_numba is not None:
+        return _aes_numba.decrypt_blocks(data, key)
+    
+    # Mở rộng khóa 1 lần cho tất cả các block
+    round_keys = _expand_inv(bytes(key))
+    
+    # Giải mã từng block, ghi thẳng vào buffer cấp phát sẵn
+    data = memoryview(data)
+    out = bytearray(len(data))
+    for i in range(0, len(data), 16):
+        out[i:i+16] = _decrypt_block_rk(data[i:i+16], round_keys)
+    
+    return bytes(out)
 
 
 def aes256_encrypt_block(plaintext, key):
@@ -234,29 +530,8 @@ def aes256_encrypt_block(plaintext, key):
     if len(key) != 32:
         raise ValueError("Key phải có độ dài 32 bytes (256-bit)")
     
-    # Mở rộng khóa
-    round_keys = key_expansion(key)
-    
-    # Chuyển plaintext thành state
-    state = bytes_to_state(plaintext)
-    
-    # Vòng đầu tiên: chỉ có AddRoundKey
-    state = add_round_key(state, round_keys[0])
-    
-    # 13 vòng tiếp theo (vòng 1-13)
-    for round_num in range(1, 14):
-        state = sub_bytes(state)
-        state = shift_rows(state)
-        state = mix_columns(state)
-        state = add_round_key(state, round_keys[round_num])
-    
-    # Vòng cuối (vòng 14): không có MixColumns
-    state = sub_bytes(state)
-    state = shift_rows(state)
-    state = add_round_key(state, round_keys[14])
-    
-    # Chuyển state thành ciphertext
-    return state_to_bytes(state)
+    # Mã hóa bằng backend nhanh nhất có sẵn
+    return _ecb_encrypt(plaintext, key)
 
 
 def aes256_decrypt_block(ciphertext, key):
@@ -276,29 +551,8 @@ def aes256_decrypt_block(ciphertext, key):
     if len(key) != 32:
         raise ValueError("Key phải có độ dài 32 bytes (256-bit)")
     
-    # Mở rộng khóa
-    round_keys = key_expansion(key)
-    
-    # Chuyển ciphertext thành state
-    state = bytes_to_state(ciphertext)
-    
-    # Vòng đầu tiên: AddRoundKey với round key cuối
-    state = add_round_key(state, round_keys[14])
-    
-    # 13 vòng tiếp theo (vòng 13-1)
-    for round_num in range(13, 0, -1):
-        state = inv_shift_rows(state)
-        state = inv_sub_bytes(state)
-        state = add_round_key(state, round_keys[round_num])
-        state = inv_mix_columns(state)
-    
-    # Vòng cuối (vòng 0): không có InvMixColumns
-    state = inv_shift_rows(state)
-    state = inv_sub_bytes(state)
-    state = add_round_key(state, round_keys[0])
-    
-    # Chuyển state thành plaintext
-    return state_to_bytes(state)
+    # Giải mã bằng backend nhanh nhất có sẵn
+    return _ecb_decrypt(ciphertext, key)
 
 
 def pkcs7_pad(data, block_size=16):
@@ -310,12 +564,40 @@ def pkcs7_pad(data, block_size=16):
     return data + padding
 
 
-def pkcs7_unpad(data):
+def _pkcs7_padding_len(data, block_size=16):
     """
-    Loại bỏ padding PKCS#7
+    Kiểm tra padding PKCS#7 và trả về số byte padding
+    Luôn kiểm tra đủ block cuối, không dừng sớm ở byte sai đầu tiên
+    (tránh để lộ vị trí lỗi qua thời gian chạy - padding oracle)
     """
+    if len(data) < block_size or len(data) % block_size != 0:
+        raise ValueError("Padding PKCS#7 không hợp lệ")
+    
     padding_len = data[-1]
-    return data[:-padding_len]
+    bad = (padding_len == 0) | (padding_len > block_size)
+    for i in range(1, block_size + 1):
+        # in_pad = 1 nếu byte thứ i tính từ cuối thuộc phần padding (i <= padding_len)
+        in_pad = ((i - padding_len - 1) >> 8) & 1
+        bad |= in_pad * (data[-i] ^ padding_len)
+    
+    if bad:
+        raise ValueError("Padding PKCS#7 không hợp lệ")
+    return padding_len
+
+
+def pkcs7_unpad(data, block_size=16):
+    """
+    Loại bỏ padding PKCS#7 (có kiểm tra padding, lỗi → ValueError)
+    """
+    return bytes(pkcs7_unpad_view(data, block_size))
+
+
+def pkcs7_unpad_view(data, block_size=16):
+    """
+    Như pkcs7_unpad nhưng trả về memoryview trên data, không copy dữ liệu
+    """
+    padding_len = _pkcs7_padding_len(data, block_size)
+    return memoryview(data)[:len(data) - padding_len]
 
 
 def aes256_encrypt(plaintext, key):
@@ -339,17 +621,19 @@ def aes256_encrypt(plaintext, key):
     if len(key) != 32:
         raise ValueError("Key phải có độ dài chính xác 32 bytes (256-bit)")
     
-    # Thêm padding
-    padded_plaintext = pkcs7_pad(plaintext)
+    # Padding PKCS#7 chỉ nằm ở block cuối: mã hóa các block đầy đủ trực tiếp
+    # từ plaintext, không tạo bản sao plaintext + padding
+    n = len(plaintext)
+    full = n - n % 16
+    padding_len = 16 - n % 16
+    ciphertext = bytearray(full + 16)
+    _ecb_encrypt_into(plaintext, full // 16, key, ciphertext)
     
-    # Mã hóa từng block
-    ciphertext = b''
-    for i in range(0, len(padded_plaintext), 16):
-        block = padded_plaintext[i:i+16]
-        encrypted_block = aes256_encrypt_block(block, key)
-        ciphertext += encrypted_block
+    # Block cuối: phần dư của plaintext + padding
+    last_block = bytes(plaintext[full:]) + bytes([padding_len]) * padding_len
+    _ecb_encrypt_into(last_block, 1, key, ciphertext, full)
     
-    return ciphertext
+    return bytes(ciphertext)
 
 
 def aes256_decrypt(ciphertext, key):
@@ -371,15 +655,57 @@ def aes256_decrypt(ciphertext, key):
     if len(key) != 32:
         raise ValueError("Key phải có độ dài chính xác 32 bytes (256-bit)")
     
-    # Giải mã từng block
-    plaintext = b''
-    for i in range(0, len(ciphertext), 16):
-        block = ciphertext[i:i+16]
-        decrypted_block = aes256_decrypt_block(block, key)
-        plaintext += decrypted_block
+    if len(ciphertext) % 16 != 0:
+        raise ValueError("Ciphertext phải có độ dài là bội số của 16 bytes")
     
-    # Loại bỏ padding
-    return pkcs7_unpad(plaintext)
+    # Giải mã toàn bộ buffer rồi loại bỏ padding
+    return pkcs7_unpad(_ecb_decrypt(ciphertext, key))
+
+
+def aes256_ctr(data, key, nonce, counter=0):
+    """
+    Mã hóa/giải mã CTR mode với AES-256 (cùng 1 hàm cho cả 2 chiều, không padding)
+    Counter block = nonce (12 bytes) || counter 32-bit big-endian
+    Tất cả counter block được mã hóa trong 1 lần gọi (VAES/AES-NI xử lý song song)
+    
+    Args:
+        data: bytes hoặc string cần mã hóa/giải mã
+        key: bytes hoặc string khóa 32 bytes (256-bit)
+        nonce: 12 bytes, không được dùng lại với cùng 1 key
+        counter: giá trị counter của block đầu tiên
+    
+    Returns:
+        bytes có cùng độ dài với data
+    """
+    # Chuyển sang bytes nếu là string
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    if isinstance(key, str):
+        key = key.encode('utf-8')
+    
+    # Kiểm tra đầu vào
+    if len(key) != 32:
+        raise ValueError("Key phải có độ dài chính xác 32 bytes (256-bit)")
+    if len(nonce) != 12:
+        raise ValueError("Nonce phải có độ dài 12 bytes")
+    
+    n = len(data)
+    n_blocks = (n + 15) // 16
+    if counter < 0 or counter + n_blocks > 1 << 32:
+        raise ValueError("Counter 32-bit bị tràn, dữ liệu quá dài")
+    if n == 0:
+        return b''
+    
+    # Tạo toàn bộ counter blocks trong 1 buffer
+    nonce = bytes(nonce)
+    counters = bytearray(16 * n_blocks)
+    for i in range(n_blocks):
+        struct.pack_into('>12sI', counters, 16 * i, nonce, counter + i)
+    
+    # Keystream = AES(counter blocks), rồi XOR với data trong 1 phép XOR số nguyên
+    keystream = _ecb_encrypt(counters, key)
+    x = int.from_bytes(data, 'big') ^ int.from_bytes(keystream[:n], 'big')
+    return x.to_bytes(n, 'big')
 
 
 # Test và demo
@@ -444,6 +770,116 @@ if __name__ == "__main__":
     print(f"Decrypted: {decrypted.decode('utf-8')}")
     print(f"Match: {decrypted.decode('utf-8') == long_message}")
     
+    # Test case 4: CTR mode
+    print("\n[Test 4] CTR Mode (NIST SP 800-38A F.5.5):")
+    print("-" * 70)
+    
+    key = bytes.fromhex('603deb1015ca71be2b73aef0857d77811f352c073b6108d72d9810a30914dff4')
+    nonce = bytes.fromhex('f0f1f2f3f4f5f6f7f8f9fafb')
+    plaintext = bytes.fromhex('6bc1bee22e409f96e93d7e117393172aae2d8a571e03ac9c9eb76fac45af8e51')
+    expected = '601ec313775789a5b7a7f504bbf3d228f443e3ca4d62b59aca84e990cacaf5c5'
+    
+    ciphertext = aes256_ctr(plaintext, key, nonce, 0xfcfdfeff)
+    print(f"Ciphertext: {ciphertext.hex()}")
+    print(f"Expected:   {expected}")
+    print(f"Match: {ciphertext.hex() == expected}")
+    
+    decrypted = aes256_ctr(ciphertext, key, nonce, 0xfcfdfeff)
+    print(f"Match: {decrypted == plaintext}")
+    
+    # Test case 5: Padding PKCS#7 / độ dài ciphertext không hợp lệ → ValueError
+    print("\n[Test 5] Invalid PKCS#7 Padding / Ciphertext Length:")
+    print("-" * 70)
+    
+    key = bytes(range(32))
+    cases = [
+        ("Wrong pad byte", aes256_encrypt_block(b'A' * 13 + b'\x01\x02\x03', key)),
+        ("Pad = 0", aes256_encrypt_block(b'A' * 15 + b'\x00', key)),
+        ("Pad > 16", aes256_encrypt_block(b'A' * 15 + b'\x11', key)),
+        ("Empty ciphertext", b''),
+        ("Length 20", bytes(20)),
+    ]
+    
+    for name, ciphertext in cases:
+        try:
+            aes256_decrypt(ciphertext, key)
+            raised = False
+        except ValueError:
+            raised = True
+        print(f"{name + ':':<18} ValueError raised → Match: {raised}")
+    
+    # Test case 6: Các hàm từng bước (mô hình tham chiếu cho các module RTL)
+    print("\n[Test 6] Step-by-step Reference Cipher (FIPS-197 C.3):")
+    print("-" * 70)
+    
+    plaintext = bytes.fromhex('00112233445566778899aabbccddeeff')
+    key = bytes.fromhex('000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f')
+    w = key_expansion(key)
+    round_key = lambda r: w[16 * r:16 * r + 16]
+    
+    state = bytearray(plaintext)
+    add_round_key(state, round_key(0))
+    for r in range(1, 14):
+        sub_bytes(state)
+        shift_rows(state)
+        mix_columns(state)
+        add_round_key(state, round_key(r))
+    sub_bytes(state)
+    shift_rows(state)
+    add_round_key(state, round_key(14))
+    print(f"Ciphertext: {state.hex()}")
+    print(f"Match: {state.hex() == '8ea2b7ca516745bfeafc49904b496089'}")
+    
+    add_round_key(state, round_key(14))
+    for r in range(13, 0, -1):
+        inv_shift_rows(state)
+        inv_sub_bytes(state)
+        add_round_key(state, round_key(r))
+        inv_mix_columns(state)
+    inv_shift_rows(state)
+    inv_sub_bytes(state)
+    add_round_key(state, round_key(0))
+    print(f"Decrypted:  {state.hex()}")
+    print(f"Match: {state == plaintext}")
+    
+    # Test case 7: Chạy thẳng từng backend (dispatch chỉ chạy backend nhanh nhất có sẵn)
+    print("\n[Test 7] FIPS-197 C.3 on Each Available Backend:")
+    print("-" * 70)
+    
+    # 9 block: đi qua cả vòng lặp 8 block (VAES) lẫn block lẻ còn lại
+    expected = bytes.fromhex('8ea2b7ca516745bfeafc49904b496089')
+    data = plaintext * 9
+    
+    def hw_run(func, d, k):
+        out = ctypes.create_string_buffer(len(d))
+        func(d, len(d) // 16, k, out)
+        return out.raw
+    
+    def tt_encrypt(d, k):
+        w = _expand(k)
+        return b''.join(_encrypt_block_rk(d[i:i+16], w) for i in range(0, len(d), 16))
+    
+    def tt_decrypt(d, k):
+        dw = _expand_inv(k)
+        return b''.join(_decrypt_block_rk(d[i:i+16], dw) for i in range(0, len(d), 16))
+    
+    backends = [("T-tables", tt_encrypt, tt_decrypt)]
+    if _aes_hw is not None:
+        backends.append(("_aes_hw", lambda d, k: hw_run(_aes_hw.encrypt_blocks, d, k),
+                         lambda d, k: hw_run(_aes_hw.decrypt_blocks, d, k)))
+    if _USE_PYCA:
+        backends.append(("cryptography", _pyca_encrypt, _pyca_decrypt))
+    if _aes_cy is not None:
+        backends.append(("_aes_cy", _aes_cy.encrypt_blocks, _aes_cy.decrypt_blocks))
+    numba_backend = _aes_numba if _aes_numba is not None else _load_aes_numba()
+    if numba_backend is not None:
+        backends.append(("_aes_numba", numba_backend.encrypt_blocks, numba_backend.decrypt_blocks))
+    
+    for name, encrypt, decrypt in backends:
+        ciphertext = encrypt(data, key)
+        print(f"{name + ':':<14} Encrypt Match: {ciphertext == expected * 9}"
+              f"  Decrypt Match: {decrypt(ciphertext, key) == data}")
+    
     print("\n" + "=" * 70)
     print("✅ TẤT CẢ CÁC TEST ĐỀU PASS!")
     print("=" * 70)
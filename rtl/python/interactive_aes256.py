@@ -3,27 +3,46 @@
 """
 CHƯƠNG TRÌNH INTERACTIVE AES-256
 Cho phép người dùng nhập plaintext và key, sau đó chọn mã hóa hoặc giải mã
+
+Chế độ ít output (khi chạy bằng script / pipe input):
+    python interactive_aes256.py --quiet     hoặc     AES_QUIET=1 python interactive_aes256.py
+→ Bỏ các banner trang trí, mỗi kết quả được in trong 1 lần ghi stdout
 """
 
-from aes256 import aes256_encrypt_block, aes256_decrypt_block, aes256_encrypt, aes256_decrypt
+import os
+import sys
+
+from aes256 import aes256_encrypt_block, aes256_decrypt_block, aes256_encrypt, aes256_decrypt, aes256_ctr
+
+# Bảng xóa khoảng trắng và dấu '-' khỏi input hex trong 1 lần duyệt
+_HEX_STRIP = str.maketrans('', '', ' \t\n\r-')
+_HEX_DIGITS = frozenset('0123456789abcdefABCDEF')
+
+# Chế độ ít output: --quiet hoặc biến môi trường AES_QUIET=1
+QUIET = '--quiet' in sys.argv[1:] or os.environ.get('AES_QUIET', '') not in ('', '0')
+
+def info(*lines):
+    """In các dòng hướng dẫn/trang trí trong 1 lần ghi (bỏ qua khi QUIET)"""
+    if not QUIET:
+        sys.stdout.write('\n'.join(lines) + '\n')
 
 def print_header():
     """In tiêu đề chương trình"""
-    print("=" * 70)
-    print(" " * 20 + "🔐 AES-256 INTERACTIVE 🔐")
-    print("=" * 70)
-    print()
+    info("=" * 70,
+         " " * 20 + "🔐 AES-256 INTERACTIVE 🔐",
+         "=" * 70,
+         "")
 
 def print_menu():
     """In menu lựa chọn"""
-    print("\n" + "=" * 70)
-    print("CHỌN CHỨC NĂNG:")
-    print("  [1] Mã hóa (Encrypt)")
-    print("  [2] Giải mã (Decrypt)")
-    print("  [3] Thoát (Exit)")
-    print("=" * 70)
+    info("\n" + "=" * 70,
+         "CHỌN CHỨC NĂNG:",
+         "  [1] Mã hóa (Encrypt)",
+         "  [2] Giải mã (Decrypt)",
+         "  [3] Thoát (Exit)",
+         "=" * 70)
 
-def get_hex_input(prompt, expected_length, data_type="hex"):
+def get_hex_input(prompt, expected_length, data_type="hex", multiple=False):
     """
     Nhận input dạng hex từ người dùng
     
@@ -31,57 +50,90 @@ def get_hex_input(prompt, expected_length, data_type="hex"):
         prompt: Thông báo nhắc nhở
         expected_length: Độ dài mong đợi (bytes)
         data_type: Loại dữ liệu ("hex" hoặc "text")
+        multiple: True → chấp nhận độ dài là bội số của expected_length
     """
+    n_hex = expected_length * 2
     while True:
-        print(f"\n{prompt}")
-        print(f"  → Nhập {expected_length} bytes ({expected_length * 2} ký tự hex)")
-        print(f"  → Ví dụ: {'00112233445566778899aabbccddeeff' if expected_length == 16 else '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f'}")
+        info(f"\n{prompt}",
+             f"  → Nhập {'bội số của ' if multiple else ''}{expected_length} bytes ({n_hex} ký tự hex)",
+             f"  → Ví dụ: {'00112233445566778899aabbccddeeff' if expected_length == 16 else '000102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f'[:expected_length * 2]}")
         
-        user_input = input("  → Nhập: ").strip().replace(" ", "").replace("-", "")
+        user_input = input("  → Nhập: ").translate(_HEX_STRIP)
         
         # Kiểm tra độ dài
-        if len(user_input) != expected_length * 2:
-            print(f"  ❌ Lỗi: Cần {expected_length * 2} ký tự hex, bạn nhập {len(user_input)} ký tự")
+        if multiple:
+            length_ok = len(user_input) > 0 and len(user_input) % n_hex == 0
+        else:
+            length_ok = len(user_input) == n_hex
+        if not length_ok:
+            print(f"  ❌ Lỗi: Cần {'bội số của ' if multiple else ''}{n_hex} ký tự hex, bạn nhập {len(user_input)} ký tự")
             retry = input("  → Nhập lại? (y/n): ").strip().lower()
             if retry != 'y':
                 return None
             continue
         
         # Kiểm tra định dạng hex
-        try:
-            bytes_data = bytes.fromhex(user_input)
-            print(f"  ✅ Đã nhận {expected_length} bytes")
-            return bytes_data
-        except ValueError:
+        if not _HEX_DIGITS.issuperset(user_input):
             print(f"  ❌ Lỗi: Định dạng hex không hợp lệ")
             retry = input("  → Nhập lại? (y/n): ").strip().lower()
             if retry != 'y':
                 return None
+            continue
+        
+        bytes_data = bytes.fromhex(user_input)
+        info(f"  ✅ Đã nhận {len(bytes_data)} bytes")
+        return bytes_data
 
 def format_hex_output(data, bytes_per_line=16):
     """Format dữ liệu hex để dễ đọc"""
-    hex_str = data.hex()
-    lines = []
-    for i in range(0, len(hex_str), bytes_per_line * 2):
-        line = hex_str[i:i + bytes_per_line * 2]
-        # Thêm khoảng trắng giữa các byte
-        formatted = ' '.join([line[j:j+2] for j in range(0, len(line), 2)])
-        lines.append(formatted)
+    # bytes.hex(' ') chèn khoảng trắng giữa các byte ngay trong C: 'aa bb cc ...'
+    hex_str = data.hex(' ')
+    step = bytes_per_line * 3
+    lines = [hex_str[i:i + step - 1] for i in range(0, len(hex_str), step)]
     return '\n    '.join(lines)
 
+def show_result(title, fields):
+    """
+    In kết quả trong 1 lần ghi stdout
+    
+    Args:
+        title: Dòng thông báo thành công
+        fields: Danh sách (icon, tên, dữ liệu bytes)
+    """
+    if QUIET:
+        out = [f"{name}: {data.hex()}\n" for _, name, data in fields]
+    else:
+        out = ["\n" + "=" * 70 + "\n", title + "\n", "=" * 70 + "\n"]
+        for icon, name, data in fields:
+            out.append(f"\n{icon} {name:<10} ({len(data)} bytes):\n")
+            out.append(f"    {format_hex_output(data)}\n")
+        out.append("\n" + "=" * 70 + "\n")
+    sys.stdout.write(''.join(out))
+    sys.stdout.flush()
+
+def save_result(filename, title, fields):
+    """Lưu kết quả vào file trong 1 lần ghi"""
+    out = [title + "\n", "=" * 70 + "\n\n"]
+    for _, name, data in fields:
+        out.append(f"{name:<10} ({len(data)} bytes): {data.hex()}\n")
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write(''.join(out))
+
 def encrypt_mode():
     """Chế độ mã hóa"""
-    print("\n" + "🔒" * 35)
-    print("CHẾ ĐỘ MÃ HÓA (ENCRYPTION)")
-    print("🔒" * 35)
+    info("\n" + "🔒" * 35,
+         "CHẾ ĐỘ MÃ HÓA (ENCRYPTION)",
+         "🔒" * 35)
     
     # Chọn chế độ
-    print("\n📌 CHỌN CHẾ ĐỘ:")
-    print("  [1] Mã hóa block thuần (16 bytes → 16 bytes, KHÔNG padding)")
-    print("  [2] Mã hóa với padding (tự động thêm padding)")
-    mode_choice = input("\n→ Chọn [1/2]: ").strip()
+    info("\n📌 CHỌN CHẾ ĐỘ:",
+         "  [1] Mã hóa block thuần (16 bytes → 16 bytes, KHÔNG padding)",
+         "  [2] Mã hóa với padding (tự động thêm padding)",
+         "  [3] Mã hóa CTR mode (cần nonce 12 bytes, KHÔNG padding)")
+    mode_choice = input("\n→ Chọn [1/2/3]: ").strip()
     
     use_block_mode = (mode_choice == '1')
+    use_ctr_mode = (mode_choice == '3')
     
     # Nhập plaintext
     plaintext = get_hex_input(
@@ -103,29 +155,40 @@ def encrypt_mode():
         print("  ⚠️  Hủy mã hóa")
         return
     
+    # Nhập nonce cho CTR mode
+    nonce = None
+    if use_ctr_mode:
+        nonce = get_hex_input(
+            "🎲 NHẬP NONCE (12 bytes, không dùng lại với cùng key):",
+            12,
+            "nonce"
+        )
+        if nonce is None:
+            print("  ⚠️  Hủy mã hóa")
+            return
+    
     # Thực hiện mã hóa
-    print("\n⏳ Đang mã hóa...")
+    info("\n⏳ Đang mã hóa...")
     try:
         if use_block_mode:
             # Mã hóa block thuần (16 bytes → 16 bytes)
             ciphertext = aes256_encrypt_block(plaintext, key)
-            print("   [Chế độ: Block thuần - KHÔNG padding]")
+            info("   [Chế độ: Block thuần - KHÔNG padding]")
+        elif use_ctr_mode:
+            # Mã hóa CTR (16 bytes → 16 bytes)
+            ciphertext = aes256_ctr(plaintext, key, nonce)
+            info("   [Chế độ: CTR - KHÔNG padding]")
         else:
             # Mã hóa với padding (16 bytes → 32 bytes)
             ciphertext = aes256_encrypt(plaintext, key)
-            print("   [Chế độ: Có PKCS#7 padding]")
+            info("   [Chế độ: Có PKCS#7 padding]")
         
         # Hiển thị kết quả
-        print("\n" + "=" * 70)
-        print("✅ MÃ HÓA THÀNH CÔNG!")
-        print("=" * 70)
-        print(f"\n📝 Plaintext  (16 bytes):")
-        print(f"    {format_hex_output(plaintext)}")
-        print(f"\n🔑 Key        (32 bytes):")
-        print(f"    {format_hex_output(key)}")
-        print(f"\n🔒 Ciphertext (16 bytes):")
-        print(f"    {format_hex_output(ciphertext)}")
-        print("\n" + "=" * 70)
+        fields = [("📝", "Plaintext", plaintext), ("🔑", "Key", key)]
+        if nonce is not None:
+            fields.append(("🎲", "Nonce", nonce))
+        fields.append(("🔒", "Ciphertext", ciphertext))
+        show_result("✅ MÃ HÓA THÀNH CÔNG!", fields)
         
         # Lưu kết quả
         save = input("\n💾 Lưu kết quả vào file? (y/n): ").strip().lower()
@@ -134,37 +197,35 @@ def encrypt_mode():
             if not filename:
                 filename = "result.txt"
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("AES-256 ENCRYPTION RESULT\n")
-                f.write("=" * 70 + "\n\n")
-                f.write(f"Plaintext  (16 bytes): {plaintext.hex()}\n")
-                f.write(f"Key        (32 bytes): {key.hex()}\n")
-                f.write(f"Ciphertext (16 bytes): {ciphertext.hex()}\n")
+            save_result(filename, "AES-256 ENCRYPTION RESULT", fields)
             
-            print(f"  ✅ Đã lưu vào file: {filename}")
+            info(f"  ✅ Đã lưu vào file: {filename}")
     
     except Exception as e:
         print(f"\n❌ LỖI: {e}")
 
 def decrypt_mode():
     """Chế độ giải mã"""
-    print("\n" + "🔓" * 35)
-    print("CHẾ ĐỘ GIẢI MÃ (DECRYPTION)")
-    print("🔓" * 35)
+    info("\n" + "🔓" * 35,
+         "CHẾ ĐỘ GIẢI MÃ (DECRYPTION)",
+         "🔓" * 35)
     
     # Chọn chế độ
-    print("\n📌 CHỌN CHẾ ĐỘ:")
-    print("  [1] Giải mã block thuần (16 bytes → 16 bytes, KHÔNG unpadding)")
-    print("  [2] Giải mã với unpadding (tự động loại bỏ padding)")
-    mode_choice = input("\n→ Chọn [1/2]: ").strip()
+    info("\n📌 CHỌN CHẾ ĐỘ:",
+         "  [1] Giải mã block thuần (16 bytes → 16 bytes, KHÔNG unpadding)",
+         "  [2] Giải mã với unpadding (tự động loại bỏ padding)",
+         "  [3] Giải mã CTR mode (cần nonce 12 bytes như khi mã hóa)")
+    mode_choice = input("\n→ Chọn [1/2/3]: ").strip()
     
     use_block_mode = (mode_choice == '1')
+    use_ctr_mode = (mode_choice == '3')
     
-    # Nhập ciphertext
+    # Nhập ciphertext (chế độ unpadding: ciphertext có thể gồm nhiều block)
     ciphertext = get_hex_input(
         "🔒 NHẬP CIPHERTEXT (Dữ liệu đã mã hóa):",
         16,
-        "ciphertext"
+        "ciphertext",
+        multiple=not (use_block_mode or use_ctr_mode)
     )
     if ciphertext is None:
         print("  ⚠️  Hủy giải mã")
@@ -180,35 +241,46 @@ def decrypt_mode():
         print("  ⚠️  Hủy giải mã")
         return
     
+    # Nhập nonce cho CTR mode
+    nonce = None
+    if use_ctr_mode:
+        nonce = get_hex_input(
+            "🎲 NHẬP NONCE (12 bytes, giống nonce khi mã hóa):",
+            12,
+            "nonce"
+        )
+        if nonce is None:
+            print("  ⚠️  Hủy giải mã")
+            return
+    
     # Thực hiện giải mã
-    print("\n⏳ Đang giải mã...")
+    info("\n⏳ Đang giải mã...")
     try:
         if use_block_mode:
             # Giải mã block thuần (16 bytes → 16 bytes)
             plaintext = aes256_decrypt_block(ciphertext, key)
-            print("   [Chế độ: Block thuần - KHÔNG unpadding]")
+            info("   [Chế độ: Block thuần - KHÔNG unpadding]")
+        elif use_ctr_mode:
+            # Giải mã CTR (16 bytes → 16 bytes)
+            plaintext = aes256_ctr(ciphertext, key, nonce)
+            info("   [Chế độ: CTR - KHÔNG unpadding]")
         else:
-            # Giải mã với unpadding (32 bytes → 16 bytes)
+            # Giải mã với unpadding (n × 16 bytes → bỏ padding)
             plaintext = aes256_decrypt(ciphertext, key)
-            print("   [Chế độ: Có PKCS#7 unpadding]")
+            info("   [Chế độ: Có PKCS#7 unpadding]")
         
         # Hiển thị kết quả
-        print("\n" + "=" * 70)
-        print("✅ GIẢI MÃ THÀNH CÔNG!")
-        print("=" * 70)
-        print(f"\n🔒 Ciphertext (16 bytes):")
-        print(f"    {format_hex_output(ciphertext)}")
-        print(f"\n🔑 Key        (32 bytes):")
-        print(f"    {format_hex_output(key)}")
-        print(f"\n📝 Plaintext  (16 bytes):")
-        print(f"    {format_hex_output(plaintext)}")
-        print("\n" + "=" * 70)
+        fields = [("🔒", "Ciphertext", ciphertext), ("🔑", "Key", key)]
+        if nonce is not None:
+            fields.append(("🎲", "Nonce", nonce))
+        fields.append(("📝", "Plaintext", plaintext))
+        show_result("✅ GIẢI MÃ THÀNH CÔNG!", fields)
         
         # Thử hiển thị dạng text
         try:
             text = plaintext.decode('utf-8', errors='ignore')
             if text.isprintable():
-                print(f"\n💬 Plaintext dạng text: {text}")
+                info(f"\n💬 Plaintext dạng text: {text}")
         except:
             pass
         
@@ -219,14 +291,9 @@ def decrypt_mode():
             if not filename:
                 filename = "result.txt"
             
-            with open(filename, 'w', encoding='utf-8') as f:
-                f.write("AES-256 DECRYPTION RESULT\n")
-                f.write("=" * 70 + "\n\n")
-                f.write(f"Ciphertext (16 bytes): {ciphertext.hex()}\n")
-                f.write(f"Key        (32 bytes): {key.hex()}\n")
-                f.write(f"Plaintext  (16 bytes): {plaintext.hex()}\n")
+            save_result(filename, "AES-256 DECRYPTION RESULT", fields)
             
-            print(f"  ✅ Đã lưu vào file: {filename}")
+            info(f"  ✅ Đã lưu vào file: {filename}")
     
     except Exception as e:
         print(f"\n❌ LỖI: {e}")
@@ -235,12 +302,12 @@ def main():
     """Hàm chính"""
     print_header()
     
-    print("📖 HƯỚNG DẪN:")
-    print("  • Plaintext: 16 bytes (128 bits) - dữ liệu cần mã hóa/giải mã")
-    print("  • Key: 32 bytes (256 bits) - khóa bí mật")
-    print("  • Định dạng: Nhập hex (ví dụ: 00112233...)")
-    print("  • Mã hóa: Plaintext + Key → Ciphertext")
-    print("  • Giải mã: Ciphertext + Key → Plaintext")
+    info("📖 HƯỚNG DẪN:",
+         "  • Plaintext: 16 bytes (128 bits) - dữ liệu cần mã hóa/giải mã",
+         "  • Key: 32 bytes (256 bits) - khóa bí mật",
+         "  • Định dạng: Nhập hex (ví dụ: 00112233...)",
+         "  • Mã hóa: Plaintext + Key → Ciphertext",
+         "  • Giải mã: Ciphertext + Key → Plaintext")
     
     while True:
         print_menu()
@@ -252,8 +319,7 @@ def main():
         elif choice == '2':
             decrypt_mode()
         elif choice == '3':
-            print("\n👋 Tạm biệt!")
-            print("=" * 70)
+            info("\n👋 Tạm biệt!", "=" * 70)
             break
         else:
             print("\n❌ Lựa chọn không hợp lệ. Vui lòng chọn 1, 2 hoặc 3.")
@@ -261,8 +327,7 @@ def main():
         if choice in ['1', '2']:
             continue_choice = input("\n🔄 Tiếp tục? (y/n): ").strip().lower()
             if continue_choice != 'y':
-                print("\n👋 Tạm biệt!")
-                print("=" * 70)
+                info("\n👋 Tạm biệt!", "=" * 70)
                 break
 
 if __name__ == "__main__":
@@ -270,7 +335,7 @@ if __name__ == "__main__":
         main()
     except KeyboardInterrupt:
         print("\n\n⚠️  Đã dừng chương trình (Ctrl+C)")
-        print("=" * 70)
+        info("=" * 70)
     except Exception as e:
         print(f"\n❌ LỖI KHÔNG MÔN: {e}")
         import traceback